@@ -1,7 +1,10 @@
+import logging
+
 from carbonkivy.uix.notification import CNotificationInline, CNotificationToast
 from kivy.app import App
 from kivy.clock import Clock
 from kivy.event import EventDispatcher
+from kivy.logger import Logger
 from kivy.properties import ListProperty
 
 
@@ -13,34 +16,64 @@ class BaseScreenModel(EventDispatcher):
     def __init__(self, *args, **kwargs) -> None:
         super(BaseScreenModel, self).__init__(*args, **kwargs)
         self.app = App.get_running_app()
+        self._observers_by_name = {}
+        self._changed_fields = {}
+        self._dispatch_changes = Clock.create_trigger(self.dispatch_changes)
 
     def add_observer(self, observer: object) -> None:
         if not observer in self._observers:
             self._observers.append(observer)
+            if isinstance(observer, EventDispatcher):
+                # Views are usually named after they are added.
+                observer.fbind("name", self._index_observers)
+            self._index_observers()
 
     def remove_observer(self, observer: object) -> None:
         if observer in self._observers:
             self._observers.remove(observer)
+            if isinstance(observer, EventDispatcher):
+                observer.funbind("name", self._index_observers)
+            self._changed_fields.pop(observer, None)
+            self._index_observers()
+
+    def _index_observers(self, *args) -> None:
+        self._observers_by_name = {}
+        for observer in self._observers:
+            self._observers_by_name.setdefault(
+                getattr(observer, "name", None), []
+            ).append(observer)
 
-    def notify_observers(self, name_screen: str) -> None:
+    def notify_observers(self, name_screen: str, changed_fields=()) -> None:
         """
         Method that will be called by the observer when the model data changes.
 
+        Notifications within a frame are coalesced, on the next frame every
+        observer notified gets a single :meth:`model_is_changed` call with
+        the set of all the fields named for it.
+
         :param name_screen:
             name of the view for which the method should be called
             :meth:`model_is_changed`.
+        :param changed_fields:
+            names of the fields of the model that changed.
         """
-        print("Notifying observers for screen:", name_screen)
-        print("Observers:", self._observers)
+        observers = self._observers_by_name.get(name_screen)
+        if not observers:
+            Logger.debug("Model: No observer named %r", name_screen)
+            return
 
-        for observer in self._observers:
-            if observer.name == name_screen:
-                Clock.schedule_once(observer.model_is_changed)
-                print("Observer notified:", observer.name)
-                break
-            else:
-                print("Observer not notified:", observer.name)
-                break
+        for observer in observers:
+            self._changed_fields.setdefault(observer, set()).update(changed_fields)
+        self._dispatch_changes()
+
+    def dispatch_changes(self, *args) -> None:
+        """Calls :meth:`model_is_changed` for the pending notifications now."""
+        changed_fields, self._changed_fields = self._changed_fields, {}
+        debug = Logger.isEnabledFor(logging.DEBUG)
+        for observer, fields in changed_fields.items():
+            if debug:
+                Logger.debug("Model: Notifying %r of %s", observer.name, sorted(fields))
+            observer.model_is_changed(fields)
 
     def notify(
         self,
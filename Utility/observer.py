@@ -1,7 +1,11 @@
 class Observer:
     """Abstract superclass for all observers."""
 
-    def model_is_changed(self):
+    def model_is_changed(self, changed_fields: set) -> None:
         """
         The method that will be called on the observer when the model changes.
+
+        :param changed_fields:
+            names of the fields of the model that changed since the last
+            call, empty when the model did not say.
         """
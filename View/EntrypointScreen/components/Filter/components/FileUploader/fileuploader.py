@@ -1,8 +1,12 @@
 import os
+from functools import partial
 
 from carbonkivy.uix.boxlayout import CBoxLayout
 from carbonkivy.uix.fileuploader import CFileUploader
-from kivy.properties import StringProperty
+from kivy.app import App
+from kivy.clock import Clock
+from kivy.logger import Logger
+from kivy.properties import BooleanProperty, StringProperty
 
 # from plyer import filechooser
 
@@ -12,6 +16,15 @@ class FileUploader(CFileUploader, CBoxLayout):
 
     data_source = StringProperty(None, allownone=True)
 
+    thumbnail = StringProperty(None, allownone=True)
+    """
+    Thumbnail of :attr:`file` from :mod:`libs.thumbnails`, None until it is
+    made or when it cannot be.
+    """
+
+    thumbnail_pending = BooleanProperty(False)
+    """True while the thumbnail of :attr:`file` is being made."""
+
     def __init__(self, **kwargs) -> None:
         super(FileUploader, self).__init__(**kwargs)
         self.filters = {
@@ -21,7 +34,38 @@ class FileUploader(CFileUploader, CBoxLayout):
         }
 
     def on_file(self, *args) -> None:
+        self.thumbnail = None
+        self.thumbnail_pending = False
         if self.file:
             self.description = os.path.basename(self.file)
+            self.request_thumbnail(self.file)
         else:
             self.description = "Upload an image"
+
+    def request_thumbnail(self, file: str) -> None:
+        try:
+            future = App.get_running_app().thumbnails.request(file)
+        except Exception as e:
+            Logger.warning(f"Thumbnails: {file}: {e}")
+            return
+        if future.done():
+            # Stored already, shown without waiting for a frame.
+            self._thumbnail_done(file, future)
+        else:
+            self.thumbnail_pending = True
+            future.add_done_callback(
+                lambda future: Clock.schedule_once(
+                    partial(self._thumbnail_done, file, future)
+                )
+            )
+
+    def _thumbnail_done(self, file: str, future, *args) -> None:
+        if file != self.file:
+            # Another file was picked in the meantime.
+            return
+        self.thumbnail_pending = False
+        try:
+            self.thumbnail = future.result()
+        except Exception as e:
+            # The previews fall back to the file itself.
+            Logger.warning(f"Thumbnails: {file}: {e}")
@@ -1,15 +1,18 @@
-import threading
+import os
 
 from carbonkivy.uix.anchorlayout import CAnchorLayout
 from carbonkivy.uix.dropdown import CDropdown
 from carbonkivy.uix.modal import CModal
+from carbonkivy.uix.notification import CNotificationToast
 from kivy.app import App
-from kivy.clock import mainthread
+from kivy.clock import Clock, mainthread
 from kivy.core.window import Window
 from kivy.event import EventDispatcher
-from kivy.properties import ObjectProperty, StringProperty
+from kivy.properties import BooleanProperty, ObjectProperty, StringProperty
 
 from libs.filter import ImageFilter
+from libs.imaging import orientation
+from libs.thumbnails import thumbnail_size
 
 
 class TypeFilterDropdown(CDropdown):
@@ -22,36 +25,142 @@ class Preview(EventDispatcher):
 
     source = StringProperty(None, allownone=True)
 
+    thumbnail = StringProperty(None, allownone=True)
+    """Downscaled copy of :attr:`source`, see :mod:`libs.thumbnails`."""
+
+    thumbnail_pending = BooleanProperty(False)
+    """True while :attr:`thumbnail` is being made."""
+
+    display_source = StringProperty("")
+    """
+    Image shown, :attr:`thumbnail` as long as it has at least as many pixels
+    as the image widget displays and :attr:`source` once the widget is larger.
+    Nothing is shown while the thumbnail is being made. Empty as well when
+    :attr:`source` is shown but tagged with an EXIF orientation, which the
+    image widget ignores, it is then rendered upright like a filter.
+    """
+
+    active_filter = StringProperty("")
+    """Filter shown over :attr:`source`, empty while it is shown as is."""
+
     dropdown = ObjectProperty()
 
     def __init__(self, **kwargs) -> None:
+        # Used by on_kv_post, which runs within __init__.
+        self._update_display_source = Clock.create_trigger(self.update_display_source)
+        self.fbind("source", self._update_display_source)
+        self.fbind("thumbnail", self._update_display_source)
+        self.fbind("thumbnail_pending", self._update_display_source)
         super(Preview, self).__init__(**kwargs)
         self.app = App.get_running_app()
         self.ft = ImageFilter()
-        self.ft.bind(texture=self.on_texture)
+        self.ft.bind(texture=self.on_texture, pending=self.on_pending)
+        self.exports = 0
+        self._upright = False
 
     def on_kv_post(self, base_widget) -> None:
         self.dropdown = TypeFilterDropdown(
             master=self.ids.filter_btn, pos=self.ids.filter_btn.pos
         )
+        self.ids.img_source.fbind("size", self._update_display_source)
+        self._update_display_source()
         return super().on_kv_post(base_widget)
 
-    def apply_filter(self, *args) -> None:
-        self.app.loading_state(True, master=self)
+    def on_source(self, instance: object, source: str | None) -> None:
+        # A new image starts unfiltered.
+        self.active_filter = ""
+
+    def update_display_source(self, *args) -> None:
+        source = self.source or ""
+        if self.thumbnail_pending:
+            # Decoding the full image now would only hold up the thumbnail.
+            source = ""
+        elif source and self.thumbnail:
+            try:
+                width, height = thumbnail_size(self.thumbnail)
+            except OSError:
+                width = height = 0
+            box_width, box_height = self.ids.img_source.size
+            if width and min(box_width / width, box_height / height) <= 1:
+                source = self.thumbnail
+        try:
+            upright = bool(source) and source == self.source
+            upright = upright and orientation(source) != 1
+        except OSError:
+            upright = False
+        if upright:
+            source = ""
+        if source != self.display_source or upright != self._upright:
+            self.display_source = source
+            self._upright = upright
+            if upright or (source and self.active_filter):
+                # The image widget just loaded the unfiltered image.
+                self.render_filter()
+
+    def selected_filter(self) -> str:
         type_filter = ""
         for item in self.dropdown.ids.selection_layout.children:
             if hasattr(item, "selected") and item.selected:
                 type_filter = item.name.lower()
-        thread = threading.Thread(
-            target=self.ft.apply,
-            kwargs={"filter_name": type_filter, "source": self.source},
+        return type_filter
+
+    def apply_filter(self, *args) -> None:
+        self.active_filter = self.selected_filter()
+        self.render_filter()
+
+    def render_filter(self, *args) -> None:
+        # Always from the original, decoded straight at the size the image
+        # widget displays, whichever of it and the thumbnail is shown.
+        self.ft.apply(
+            self.active_filter, self.source, size=tuple(self.ids.img_source.size)
         )
-        thread.start()
+
+    def export_filter(self, *args) -> None:
+        """
+        Renders the filter shown at full resolution and saves it, or the
+        original when none is applied.
+        """
+        if not self.source:
+            return
+        self.exports += 1
+        self.update_loading()
+        type_filter = self.active_filter
+        name = os.path.splitext(os.path.basename(self.source))[0]
+        destination = os.path.join(
+            self.app.user_data_dir,
+            "exports",
+            f"{name}-{type_filter or 'original'}.png",
+        )
+        self.ft.executor.submit(self._export, type_filter, self.source, destination)
+
+    def _export(self, type_filter: str, source: str, destination: str) -> None:
+        try:
+            self.ft.export(type_filter, source, destination)
+            self._export_done(destination)
+        except Exception as e:
+            self._export_done(destination, error=e)
+
+    @mainthread
+    def _export_done(self, destination: str, error: Exception | None = None) -> None:
+        self.exports -= 1
+        self.update_loading()
+        CNotificationToast(
+            title="Export failed" if error else "Exported",
+            subtitle=f"{error}" if error else destination,
+            status="Error" if error else "Success",
+        ).open()
 
     def on_texture(self, instance: object, texture: object, *args) -> None:
         self.ids.img_source.texture = texture
         self.ids.img_source.canvas.ask_update()
-        self.app.loading_state(False, master=self)
+
+    def on_pending(self, instance: object, pending: int, *args) -> None:
+        self.update_loading()
+
+    def update_loading(self) -> None:
+        # Stays visible while any filter job or export of this preview is
+        # queued or running.
+        self.app.loading_state(self.ft.pending > 0 or self.exports > 0, master=self)
 
 
 class WindowPreview(Preview, CModal):
@@ -75,6 +184,7 @@ class ImagePreview(Preview, CAnchorLayout):
         self.window_preview = WindowPreview()
 
     def preview(self, *args):
+        self.window_preview.thumbnail = self.thumbnail
         self.window_preview.source = self.source
         try:
             Window.add_widget(self.window_preview)
@@ -3,8 +3,11 @@ import os
 import subprocess  # nosec
 import sys
 
+from kivy.properties import NumericProperty
 from kivy.utils import platform
 
+from libs import tracing
+from libs.sorting import check_count
 from View.base_screen import BaseScreenView
 
 if platform == "android":
@@ -13,24 +16,66 @@ if platform == "android":
 
 class Sort(BaseScreenView):
 
+    count = NumericProperty(15)
+    """Number of bars the visualizer is launched with."""
+
     def __init__(self, **kwargs) -> None:
         super(Sort, self).__init__(**kwargs)
-
-    def run_entrypoint(self, namesort: str | None = None) -> None:
-        entrypoint_path = os.path.abspath(
+        self.entrypoint_path = os.path.abspath(
             os.path.join(self.app.directory, "libs", "test.py")
         )
-        target_dir = os.path.dirname(entrypoint_path)
-        with open(os.path.join(target_dir, "env.json"), "w", encoding="utf-8") as env_file:
-            json.dump({"namesort": namesort}, env_file, ensure_ascii=False, indent=4)
+        self.runner = None
+
+    def on_enter(self, *args) -> None:
+        self.prewarm()
+
+    def prewarm(self) -> None:
+        """
+        Starts the visualizer ahead of time on desktop. The runner imports
+        everything and opens its window hidden, then waits for the
+        parameters of its sort on stdin, so a launch only has to send them.
+        Each runner is launched once and replaced right away.
+        """
+        if platform == "android" or (
+            self.runner is not None and self.runner.poll() is None
+        ):
+            return
+        env = dict(os.environ, KIVY_NO_ARGS="1")
+        if tracing.enabled:
+            # Each runner records its own trace next to the app's.
+            env[tracing.ENV] = tracing.child_path("sort")
+        self.runner = subprocess.Popen(
+            [sys.executable, self.entrypoint_path, "--wait"],
+            stdin=subprocess.PIPE,
+            cwd=os.path.dirname(self.entrypoint_path),
+            env=env,
+        )  # nosec
+
+    def release(self) -> None:
+        if self.runner is not None:
+            # A runner exits once its stdin closes without parameters.
+            self.runner.stdin.close()
+            self.runner = None
+
+    def run_entrypoint(
+        self, namesort: str | None = None, race: list | None = None
+    ) -> None:
+        """
+        Launches the visualizer on `namesort`, or races the algorithms in
+        `race` against each other on the same data.
+        """
+        params = {"namesort": namesort, "count": self.count, "race": race}
         try:
+            check_count(race or [namesort], self.count)
             if platform == "android":
-                launch_client_activity(entrypoint_path)
+                launch_client_activity(self.entrypoint_path, params)
             else:
-                self.process = subprocess.Popen(
-                    [sys.executable, entrypoint_path], cwd=target_dir, env=os.environ
-                )  # nosec
-                print(f"[RUN] {os.path.basename(entrypoint_path)} launched...")
+                self.prewarm()
+                self.process, self.runner = self.runner, None
+                self.process.stdin.write(json.dumps(params).encode("utf-8") + b"\n")
+                self.process.stdin.close()
+                print(f"[RUN] {os.path.basename(self.entrypoint_path)} launched...")
+                self.prewarm()
         except Exception as e:
             print(e)
             self.notify(
@@ -0,0 +1,197 @@
+import math
+import os
+import threading
+
+from carbonkivy.uix.label import CLabel
+from kivy.clock import mainthread
+from kivy.graphics import Color, Line
+from kivy.metrics import dp
+from kivy.properties import (
+    BooleanProperty,
+    ColorProperty,
+    ListProperty,
+    ObjectProperty,
+    StringProperty,
+)
+from kivy.uix.widget import Widget
+
+from libs.sortstats import load, run, save_json, steps
+from View.base_screen import BaseScreenView
+
+
+class GrowthChart(Widget):
+    """
+    Log-log line chart, a straight line of slope k is growth of n^k.
+    """
+
+    series = ListProperty()
+    """List of ``(label, rgba, [(n, y), ...])`` drawn one line each."""
+
+    axis_color = ColorProperty([0, 0, 0, 1])
+
+    def __init__(self, **kwargs) -> None:
+        super(GrowthChart, self).__init__(**kwargs)
+        self.bind(
+            pos=self.redraw,
+            size=self.redraw,
+            series=self.redraw,
+            axis_color=self.redraw,
+        )
+
+    def redraw(self, *args) -> None:
+        self.canvas.clear()
+        points = [
+            (math.log(n), math.log(y))
+            for _, _, line in self.series
+            for n, y in line
+            if n > 0 and y > 0
+        ]
+        if not points:
+            return
+        low_x, high_x = min(x for x, _ in points), max(x for x, _ in points)
+        low_y, high_y = min(y for _, y in points), max(y for _, y in points)
+        scale_x = self.width / ((high_x - low_x) or 1)
+        scale_y = self.height / ((high_y - low_y) or 1)
+
+        with self.canvas:
+            Color(*self.axis_color)
+            Line(points=[self.x, self.top, self.x, self.y, self.right, self.y])
+            for _, rgba, line in self.series:
+                Color(*rgba)
+                Line(
+                    points=[
+                        value
+                        for n, y in line
+                        if n > 0 and y > 0
+                        for value in (
+                            self.x + (math.log(n) - low_x) * scale_x,
+                            self.y + (math.log(y) - low_y) * scale_y,
+                        )
+                    ],
+                    width=dp(1.5),
+                )
+
+
+class Stats(BaseScreenView):
+
+    HUES = (
+        "blue",
+        "red",
+        "green",
+        "purple",
+        "magenta",
+        "cyan",
+        "teal",
+        "orange",
+        "yellow",
+        "gray",
+    )
+
+    distribution = StringProperty("random")
+
+    metric = StringProperty("steps")
+    """Charted measure, "steps" (compares, swaps and writes) or "seconds"."""
+
+    report = ObjectProperty(None, allownone=True)
+    """Report of :func:`libs.sortstats.run`."""
+
+    measuring = BooleanProperty(False)
+    """True while a measurement runs in the background, only one runs at a time."""
+
+    def __init__(self, **kwargs) -> None:
+        super(Stats, self).__init__(**kwargs)
+        self._cancel = threading.Event()
+        self.bind(
+            report=self.update_chart,
+            distribution=self.update_chart,
+            metric=self.update_chart,
+        )
+
+    def on_enter(self, *args) -> None:
+        if self.report is None:
+            self.measure()
+
+    def measure(self, rerun: bool = False) -> None:
+        """
+        Shows the saved report, measuring the algorithms in the background
+        when there is none yet or `rerun` is True.
+        """
+        path = os.path.join(self.app.user_data_dir, "sortstats.json")
+        if not rerun and os.path.exists(path):
+            self.report = load(path)
+            return
+        if self.measuring:
+            return
+        self.measuring = True
+        self.app.loading_state(True, master=self)
+        threading.Thread(target=self._measure, args=(path,), daemon=True).start()
+
+    def release(self) -> None:
+        # A screen built again would measure again, this one stops.
+        self._cancel.set()
+        if self.measuring:
+            # The loading layout is shared, it must not leave with this screen.
+            self.app.loading_state(False, master=self)
+
+    def _measure(self, path: str) -> None:
+        try:
+            # Small enough to finish in seconds on a phone.
+            report = run(
+                sizes=(128, 256, 512, 1024), timeout=1.0, cancelled=self._cancel.is_set
+            )
+            if self._cancel.is_set():
+                return
+            save_json(report, path)
+            self._measured(report)
+        except Exception as e:
+            self._measured(None, e)
+
+    @mainthread
+    def _measured(self, report: dict | None, error: Exception | None = None) -> None:
+        self.measuring = False
+        self.app.loading_state(False, master=self)
+        if error is not None:
+            self.notify(
+                status="Error", title="Error", subtitle=f"{error}", variant="Toast"
+            )
+            return
+        self.report = report
+
+    def update_chart(self, *args) -> None:
+        legend = self.ids.legend
+        legend.clear_widgets()
+        if self.report is None:
+            self.ids.chart.series = []
+            return
+
+        lines = {}
+        for result in self.report["results"]:
+            if result["distribution"] == self.distribution:
+                y = steps(result) if self.metric == "steps" else result["seconds"]
+                lines.setdefault(result["algorithm"], []).append((result["n"], y))
+        exponents = {
+            fit["algorithm"]: fit[self.metric]
+            for fit in self.report["exponents"]
+            if fit["distribution"] == self.distribution
+        }
+
+        series = []
+        for index, (algorithm, line) in enumerate(lines.items()):
+            rgba = getattr(self.app, f"{self.HUES[index % len(self.HUES)]}_50")
+            series.append((algorithm, rgba, line))
+            exponent = exponents.get(algorithm)
+            legend.add_widget(
+                CLabel(
+                    text=(
+                        f"{algorithm.capitalize()}  n^{exponent:.2f}"
+                        if exponent is not None
+                        else algorithm.capitalize()
+                    ),
+                    style="body_compact_01",
+                    color=rgba,
+                    adaptive=[False, True],
+                    size_hint_x=None,
+                    width=dp(160),
+                )
+            )
+        self.ids.chart.series = series
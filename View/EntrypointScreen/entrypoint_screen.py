@@ -6,9 +6,11 @@ class EntrypointScreenView(BaseScreenView):
     def __init__(self, *args, **kwargs) -> None:
         super(EntrypointScreenView, self).__init__(*args, **kwargs)
 
-    def model_is_changed(self) -> None:
+    def model_is_changed(self, changed_fields: set) -> None:
         """
         Called whenever any change has occurred in the data model.
         The view in this method tracks these changes and updates the UI
         according to these changes.
+
+        :param changed_fields: names of the fields that changed.
         """
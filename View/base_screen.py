@@ -64,6 +64,13 @@ class BaseScreenView(CScreen, Observer):
             if self.view_model is not None and (not self in self.view_model._observers):
                 value.add_observer(self)
 
+    def release(self) -> None:
+        """
+        Called when the screen is unloaded by its
+        :class:`~View.screen_manager.LazyScreenManager`, to free what its
+        widgets going away does not, such as processes.
+        """
+
     def notify(
         self,
         variant: str = "Inline",
@@ -0,0 +1,128 @@
+"""
+Screen manager building its screens on demand, shared by the entry points.
+"""
+
+from carbonkivy.uix.screenmanager import CScreenManager
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.factory import Factory
+from kivy.properties import DictProperty, NumericProperty, OptionProperty
+
+from libs import tracing
+
+
+class LazyScreenManager(CScreenManager):
+    """
+    Screen manager that builds its :attr:`lazy_screens` on first use.
+
+    A lazy screen is created when it first becomes current, or ahead of that
+    by :meth:`prebuild`, one screen at a time between frames once the app is
+    up, so that navigating to it does not have to build it within a frame.
+    """
+
+    lazy_screens = DictProperty()
+    """
+    Screens to build on demand, by name. Values are either the Factory name
+    of a :class:`~View.base_screen.BaseScreenView` or a callable returning
+    the screen.
+    """
+
+    prebuild_delay = NumericProperty(0.25)
+    """Seconds between two screens built by :meth:`prebuild`, negative disables it."""
+
+    unload_policy = OptionProperty(
+        "low_memory", options=["never", "low_memory", "inactive"]
+    )
+    """
+    When built lazy screens that are not current are unloaded by
+    :meth:`unload_inactive`: never, when the OS warns of low memory, or as
+    soon as they are left. An unloaded screen is built again the next time
+    it becomes current. A screen with a view model comes back with its
+    state, the model outlives the view, others come back as new.
+
+    Each manager unloads its own screens. The current screen of a manager is
+    never unloaded, so neither is the only screen of the top level one.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._unloaded = set()
+        # Used by the property handlers, which run within __init__.
+        self._prebuild = Clock.create_trigger(
+            self.prebuild, max(0, self.prebuild_delay)
+        )
+        self._unload = Clock.create_trigger(self.unload_inactive)
+        super(LazyScreenManager, self).__init__(*args, **kwargs)
+        Window.bind(on_memorywarning=self.on_memorywarning)
+
+    def on_prebuild_delay(self, instance, value) -> None:
+        self._prebuild.timeout = max(0, value)
+
+    def on_lazy_screens(self, instance, value) -> None:
+        if self.current in value and not self.has_screen(self.current):
+            self.property("current").dispatch(self)
+        if self.prebuild_delay >= 0:
+            # Not before the current screen is on screen.
+            Window.bind(on_flip=self._start_prebuild)
+
+    def _start_prebuild(self, *args) -> None:
+        Window.unbind(on_flip=self._start_prebuild)
+        self._prebuild()
+
+    def on_current(self, instance, value) -> None:
+        if value in self.lazy_screens:
+            self.build_screen(value)
+        elif value is not None and not self.has_screen(value):
+            # kv can set current before lazy_screens, shown once that is set.
+            return
+        super(LazyScreenManager, self).on_current(instance, value)
+        if self.unload_policy == "inactive":
+            self._unload()
+
+    def build_screen(self, name: str) -> object:
+        """Creates the lazy screen `name` unless it exists, returns the screen."""
+        if self.has_screen(name):
+            return self.get_screen(name)
+        with tracing.span("build screen", "startup", name=name):
+            factory = self.lazy_screens[name]
+            if isinstance(factory, str):
+                screen = Factory.get(factory)(name=name, manager_screens=self)
+            else:
+                screen = factory()
+                screen.name = name
+            self._unloaded.discard(name)
+            self.add_widget(screen)
+        return screen
+
+    def prebuild(self, *args) -> None:
+        """
+        Builds the first lazy screen not built yet and schedules itself for
+        the next one. Unloaded screens are left to be built on navigation.
+        """
+        if self.transition.is_active:
+            self._prebuild()
+            return
+        for name in self.lazy_screens:
+            if not self.has_screen(name) and name not in self._unloaded:
+                self.build_screen(name)
+                self._prebuild()
+                return
+
+    def unload_inactive(self, *args) -> None:
+        if self.transition.is_active:
+            # The screen left stays on screen until the transition is over.
+            self._unload()
+            return
+        for screen in self.screens[:]:
+            if screen is self.current_screen or screen.name not in self.lazy_screens:
+                continue
+            self.remove_widget(screen)
+            release = getattr(screen, "release", None)
+            if release is not None:
+                release()
+            if getattr(screen, "view_model", None) is not None:
+                screen.view_model.remove_observer(screen)
+            self._unloaded.add(screen.name)
+
+    def on_memorywarning(self, *args) -> None:
+        if self.unload_policy != "never":
+            self.unload_inactive()
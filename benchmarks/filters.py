@@ -0,0 +1,254 @@
+"""
+Benchmark suite for the image filter engine.
+
+Runs every registered filter and a few pipelines over a matrix of image sizes
+and modes on synthetic images, headless. Every case runs in a fresh process so
+its peak RSS is its own. Results are written as JSON and two runs can be
+compared, failing when a case got slower than a threshold.
+
+Usage::
+
+    python benchmarks/filters.py run -o before.json [--sizes 0.3,2] [--modes L]
+        [--engine app|pipeline|tiled]
+    python benchmarks/filters.py compare before.json after.json [--threshold 0.1]
+
+``alloc_bytes`` is how much the peak RSS grew while the case ran on top of the
+input image, Pillow allocates pixel memory outside the Python heap so this is
+a better measure than tracemalloc. On Linux the peak is reset once the input
+is built; elsewhere it also covers building the input, which understates
+``alloc_bytes``.
+
+``--engine`` picks what runs the pipeline: ``app`` does what the app does,
+tiling images of :data:`~libs.imaging.TILED_PIXELS` and more, ``pipeline``
+and ``tiled`` force one or the other.
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PIL
+from PIL import Image
+
+from libs.imaging import FILTERS, TILED_PIXELS, parse_pipeline, run_pipeline, run_tiled
+
+SIZES = (0.3, 2, 12, 48)
+MODES = ("RGB", "RGBA", "L")
+PIPELINES = (
+    "warm,contrast",
+    "grayscale,blur,edges",
+    "warm,contrast,blur,posterize,invert",
+)
+
+
+def synthetic_image(megapixels: float, mode: str) -> Image.Image:
+    """Deterministic 4:3 test image made of gradients."""
+    width = round(math.sqrt(megapixels * 1e6 * 4 / 3))
+    height = round(width * 3 / 4)
+    linear = Image.linear_gradient("L").resize((width, height))
+    radial = Image.radial_gradient("L").resize((width, height))
+    bands = (linear, radial, linear.transpose(Image.Transpose.ROTATE_180), radial)
+    img = Image.merge("RGBA", bands)
+    return img if mode == "RGBA" else img.convert(mode)
+
+
+ENGINES = ("app", "pipeline", "tiled")
+
+
+def run_engine(engine: str, img: Image.Image, stages: tuple) -> Image.Image:
+    if engine == "tiled" or (
+        # As libs.imaging.render decides.
+        engine == "app"
+        and img.width * img.height >= TILED_PIXELS
+    ):
+        return run_tiled(img, stages)
+    return run_pipeline(img, stages)
+
+
+def reset_peak_rss() -> bool:
+    """Lowers the peak RSS of this process to its current RSS, Linux only."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_case(
+    pipeline: str, megapixels: float, mode: str, repeat: int, engine: str
+) -> dict:
+    stages = parse_pipeline(pipeline)
+    img = synthetic_image(megapixels, mode)
+    img.load()
+    # The gradients the input is made of are gone but still count in the
+    # peak, start from what is actually resident.
+    reset_peak_rss()
+    rss_before = peak_rss()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_engine(engine, img, stages)
+        timings.append(time.perf_counter() - start)
+
+    rss_after = peak_rss()
+    return {
+        "pipeline": pipeline,
+        "megapixels": megapixels,
+        "mode": mode,
+        "engine": engine,
+        "width": img.width,
+        "height": img.height,
+        "times": timings,
+        "best": min(timings),
+        "median": statistics.median(timings),
+        "peak_rss": rss_after,
+        "alloc_bytes": None if rss_after is None else rss_after - rss_before,
+    }
+
+
+def case_key(result: dict) -> tuple:
+    # Runs from before --engine existed all ran run_pipeline.
+    engine = result.get("engine", "pipeline")
+    return result["pipeline"], result["megapixels"], result["mode"], engine
+
+
+def run(args: argparse.Namespace) -> int:
+    pipelines = args.filters.split(";") if args.filters else [*FILTERS, *PIPELINES]
+    sizes = [float(size) for size in args.sizes.split(",")]
+    modes = args.modes.split(",")
+
+    results = []
+    # One fresh process per case keeps peak RSS figures independent.
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for megapixels in sizes:
+            for mode in modes:
+                for pipeline in pipelines:
+                    result = pool.apply(
+                        run_case,
+                        (pipeline, megapixels, mode, args.repeat, args.engine),
+                    )
+                    results.append(result)
+                    rss = result["peak_rss"]
+                    print(
+                        f"{pipeline:<40} {megapixels:>5}MP {mode:<4} {args.engine:<8}"
+                        f" {result['best'] * 1000:>10.1f}ms"
+                        f" {rss / 2**20 if rss else 0:>8.0f}MB peak",
+                        flush=True,
+                    )
+
+    report = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "engine": args.engine,
+            "tiled_pixels": TILED_PIXELS,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=4)
+    print(f"Wrote {len(results)} results to {args.output}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.baseline, "r", encoding="utf-8") as file:
+        baseline = {case_key(result): result for result in json.load(file)["results"]}
+    with open(args.current, "r", encoding="utf-8") as file:
+        current = json.load(file)["results"]
+
+    regressions = unmatched = 0
+    for result in current:
+        before = baseline.get(case_key(result))
+        if before is None:
+            unmatched += 1
+            continue
+        ratio = result["best"] / before["best"]
+        status = "ok"
+        if ratio > 1 + args.threshold:
+            status = "SLOWER"
+            regressions += 1
+        elif ratio < 1 - args.threshold:
+            status = "faster"
+        pipeline, megapixels, mode, engine = case_key(result)
+        print(
+            f"{pipeline:<40} {megapixels:>5}MP {mode:<4} {engine:<8}"
+            f" {before['best'] * 1000:>10.1f}ms {result['best'] * 1000:>10.1f}ms"
+            f" {ratio:>6.2f}x {status}"
+        )
+
+    if unmatched:
+        print(f"{unmatched} case(s) without a baseline")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("-o", "--output", default="bench_filters.json")
+    run_parser.add_argument(
+        "--sizes", default=",".join(str(size) for size in SIZES), help="megapixels"
+    )
+    run_parser.add_argument("--modes", default=",".join(MODES))
+    run_parser.add_argument(
+        "--filters",
+        help="pipelines separated by ';', e.g. 'sepia;grayscale,blur' "
+        "(default: every filter and a few pipelines)",
+    )
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="app",
+        help="app tiles large images like the app does (default: app)",
+    )
+    run_parser.set_defaults(function=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="allowed slowdown as a fraction (default: 0.1)",
+    )
+    compare_parser.set_defaults(function=compare)
+
+    args = parser.parse_args()
+    return args.function(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
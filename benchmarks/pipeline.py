@@ -0,0 +1,85 @@
+"""
+Micro-benchmark for fused filter pipelines.
+
+Compares applying a chain of filters one stage at a time, the way chained
+:meth:`ImageFilter.apply` calls had to (every stage decodes the source,
+converts, filters unfused and reads the pixels back for its texture), against a single pipeline call
+that decodes, converts and reads back once, for 2, 3 and 5 stage chains.
+
+Usage::
+
+    python benchmarks/pipeline.py [--size 2000x1500] [--repeat 5]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from libs.imaging import FILTERS, normalize_pipeline, run_pipeline
+
+CHAINS = {
+    2: ["warm", "contrast"],
+    3: ["grayscale", "blur", "edges"],
+    5: ["warm", "contrast", "blur", "posterize", "invert"],
+}
+
+
+def synthetic_jpeg(width: int, height: int) -> bytes:
+    img = Image.radial_gradient("L").resize((width, height))
+    img = Image.merge("RGB", (img, img.transpose(Image.Transpose.ROTATE_180), img))
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def stage_by_stage(data: bytes, chain: list) -> None:
+    for name, params in normalize_pipeline(chain):
+        # Every apply call opened its source again. The filters cost the same
+        # whatever the pixels, so each stage can start from the original.
+        img = Image.open(io.BytesIO(data)).convert("RGBA")
+        img = FILTERS[name](img, **dict(params))
+        img = Image.frombytes("RGBA", img.size, img.tobytes())
+
+
+def fused(data: bytes, chain: list) -> None:
+    img = Image.open(io.BytesIO(data)).convert("RGBA")
+    run_pipeline(img, chain).tobytes()
+
+
+def best_of(repeat: int, function, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", default="2000x1500", help="WIDTHxHEIGHT")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.size.lower().split("x"))
+    data = synthetic_jpeg(width, height)
+
+    print(f"{width}x{height} JPEG, best of {args.repeat}")
+    print(f"{'stages':>6} {'separate':>10} {'pipeline':>10} {'speedup':>8}")
+    for stages, chain in CHAINS.items():
+        separate = best_of(args.repeat, stage_by_stage, data, chain)
+        pipeline = best_of(args.repeat, fused, data, chain)
+        print(
+            f"{stages:>6} {separate * 1000:>8.1f}ms {pipeline * 1000:>8.1f}ms"
+            f" {separate / pipeline:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
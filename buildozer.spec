@@ -28,6 +28,7 @@ source.include_patterns = assets/*,assets/images/*.png,libs/*.json
 
 # (list) List of directory to exclude (leave empty to not exclude anything)
 #source.exclude_dirs = tests, bin, venv
+source.exclude_dirs = benchmarks
 
 # (list) List of exclusions using pattern matching
 # Do not prefix with './'
@@ -1,121 +1,130 @@
 # filter.py
-import io
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 
 from kivy.clock import Clock
 from kivy.event import EventDispatcher
 from kivy.graphics.texture import Texture
-from kivy.properties import ObjectProperty
+from kivy.properties import NumericProperty, ObjectProperty
 from PIL import Image
-from PIL import ImageFilter as PilFilter
-from PIL import ImageOps
+
+from libs import tracing
+from libs.imaging import FILTERS, image_cache, render, save, to_pixels
+
+# Bounded worker pool shared by every ImageFilter, Pillow releases the GIL
+# while it decodes and filters so threads are enough.
+executor = ThreadPoolExecutor(
+    max_workers=min(2, os.cpu_count() or 1), thread_name_prefix="ImageFilter"
+)
 
 
 class ImageFilter(EventDispatcher):
 
     texture = ObjectProperty()
 
+    pending = NumericProperty(0)
+    """
+    Number of jobs submitted through :meth:`apply` that have not finished yet.
+
+    :attr:`pending` is an :class:`~kivy.properties.NumericProperty`
+    and defaults to `0`.
+    """
+
     def __init__(self, **kwargs) -> None:
         super(ImageFilter, self).__init__(**kwargs)
-        # Register filters here
-        self.filters = {
-            "grayscale": self._grayscale,
-            "sepia": self._sepia,
-            "blur": self._blur,
-            "reflection": self._reflect,
-            "edges": self._edges,
-        }
-
-    def apply(self, filter_name, source):
+        # Filters are registered with `libs.imaging.register_filter`
+        self.filters = FILTERS
+        self.cache = image_cache
+        self.executor = executor
+        self.generation = 0
+        self._future = None
+
+    def render(self, filter_name, source, size=None) -> Image.Image:
         """
-        Apply a filter to an image and return a Kivy Texture.
-        :param filter_name: str, name of the filter
+        Apply a filter, or a pipeline of filters, to an image and return the
+        resulting Pillow Image. Safe to call from any thread.
+        :param filter_name: str, name of the filter, or a sequence of names
+            and ``(name, params)`` pairs applied in order, empty for the
+            image as it is
         :param source: str (path) or bytes buffer
-        :return: kivy.graphics.texture.Texture
+        :param size: (width, height) the result is displayed at, None renders
+            at full resolution
+        :return: PIL.Image.Image
         """
-        # Load image from path or buffer
-        if isinstance(source, str):
-            img = Image.open(source).convert("RGBA")
-        elif isinstance(source, (bytes, bytearray, io.BytesIO)):
-            img = Image.open(io.BytesIO(source)).convert("RGBA")
-        else:
-            raise ValueError("Unsupported source type")
-
-        # Apply filter
-        if filter_name not in self.filters:
-            raise ValueError(f"Filter '{filter_name}' not supported")
-        img = self.filters[filter_name](img)
-
-        # Convert to Kivy Texture
-        def _apply(dt):
-            try:
-                self.texture = self._to_texture(img)
-            except Exception as e:
-                print(e)
-
-        Clock.schedule_once(_apply)
-        return self._to_texture(img)
-
-    # ---------------- FILTER IMPLEMENTATIONS ---------------- #
-
-    def _grayscale(self, img):
-        return ImageOps.grayscale(img).convert("RGBA")
-
-    def _sepia(self, img):
-        sepia_img = img.convert("RGBA")
-        pixels = sepia_img.load()
-        for y in range(sepia_img.height):
-            for x in range(sepia_img.width):
-                r, g, b, a = pixels[x, y]
-                tr = int(0.393 * r + 0.769 * g + 0.189 * b)
-                tg = int(0.349 * r + 0.686 * g + 0.168 * b)
-                tb = int(0.272 * r + 0.534 * g + 0.131 * b)
-                pixels[x, y] = (min(tr, 255), min(tg, 255), min(tb, 255), a)
-
-        return sepia_img
-
-    def _blur(self, img: Image.Image) -> Image.Image:
-        # Normalize and copy to avoid read-only / stream issues
-        if img.mode not in ("RGB", "RGBA"):
-            img = img.convert("RGBA")
-        work = img.copy()
-
-        try:
-            # Basic box blur equivalent to BLUR
-            return work.filter(PilFilter.BLUR)
-        except Exception:
-            # Fallbacks that are widely supported
-            try:
-                return work.filter(PilFilter.BoxBlur(1))
-            except Exception:
-                return work.filter(PilFilter.GaussianBlur(1))
-
-    def _reflect(self, img):
-        return ImageOps.mirror(img)
-
-    def _edges(self, img):
-        # Normalize mode: FIND_EDGES works best on RGB
-        if img.mode not in ("RGB", "L"):
-            img = img.convert("RGB")
+        return render(filter_name, source, size, cache=self.cache)
 
+    def apply(self, filter_name, source, size=None) -> Future:
+        """
+        Queue a filter, or a pipeline of filters, on the shared executor.
+        The result is uploaded to :attr:`texture` on the main thread.
+
+        Every call supersedes the previous ones of this instance: a job still
+        waiting in the queue is cancelled and a running one is discarded once
+        it finishes, so only the latest request reaches :attr:`texture`.
+        Must be called from the main thread.
+        :param filter_name: str, name of the filter, or a sequence of names
+            and ``(name, params)`` pairs applied in order, empty for the
+            image as it is
+        :param source: str (path) or bytes buffer
+        :param size: (width, height) of the widget showing the result, the
+            filter then runs on a downscaled proxy of the image. None renders
+            at full resolution.
+        :return: concurrent.futures.Future of the ``(size, pixels)`` pair
+            uploaded to :attr:`texture`, see :func:`to_pixels`
+        """
+        self.generation += 1
+        if self._future is not None:
+            self._future.cancel()
+        self.pending += 1
+        self._future = self.executor.submit(
+            self._run, self.generation, filter_name, source, size
+        )
+        self._future.add_done_callback(partial(self._job_done, self.generation))
+        return self._future
+
+    def _run(self, generation: int, filter_name, source, size) -> tuple | None:
+        if generation != self.generation:
+            # A newer request came in while this one was starting.
+            return None
+        with tracing.span("filter job", "filter"):
+            img = self.render(filter_name, source, size)
+            return img.size, to_pixels(img)
+
+    def _job_done(self, generation: int, future: Future) -> None:
+        Clock.schedule_once(partial(self._finish, generation, future))
+
+    def _finish(self, generation: int, future: Future, *args) -> None:
+        self.pending -= 1
+        if generation != self.generation or future.cancelled():
+            return
         try:
-            # Apply Pillow’s built-in edge detection
-            edge_img = img.filter(PilFilter.FIND_EDGES)
-        except Exception:
-            # Fallback Laplacian kernel if FIND_EDGES fails
-            kernel = [-1, -1, -1, -1, 8, -1, -1, -1, -1]
-            edge_img = img.filter(PilFilter.Kernel((3, 3), kernel, scale=1))
+            self._upload(*future.result())
+        except Exception as e:
+            print(e)
 
-        # Convert back to RGBA for Kivy texture compatibility
-        return edge_img.convert("RGBA")
+    def export(self, filter_name, source, destination: str) -> str:
+        """
+        Render a filter at full resolution and save it to `destination`.
+        The file format follows the extension of `destination`. An empty
+        `filter_name` saves the image as it is, upright.
+        """
+        return save(self.render(filter_name, source), destination)
 
     # ---------------- HELPER ---------------- #
 
-    def _to_texture(self, img):
+    def _upload(self, size: tuple, pixels: bytes) -> None:
         """
-        Convert Pillow Image to Kivy Texture.
+        Upload a pixel buffer from :func:`to_pixels` to :attr:`texture`.
+        Main thread only, the texture is reused while the size stays the same.
         """
-        img_data = img.tobytes()
-        texture = Texture.create(size=img.size, colorfmt="rgba")
-        texture.blit_buffer(img_data, colorfmt="rgba", bufferfmt="ubyte")
-        texture.flip_vertical()
-        return texture
+        with tracing.span("upload", "filter", size=size):
+            texture = self.texture
+            if texture is not None and tuple(texture.size) == tuple(size):
+                texture.blit_buffer(pixels, colorfmt="rgba", bufferfmt="ubyte")
+                # Same object, so observers have to be told explicitly.
+                self.property("texture").dispatch(self)
+            else:
+                texture = Texture.create(size=size, colorfmt="rgba")
+                texture.blit_buffer(pixels, colorfmt="rgba", bufferfmt="ubyte")
+                self.texture = texture
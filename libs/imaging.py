@@ -0,0 +1,774 @@
+"""
+Image filter engine.
+
+Pure Pillow, this module never imports Kivy so it can be used headless, see
+:mod:`libs.filter` for the Kivy front end. Run ``python -m libs.imaging -h``
+for the batch command line.
+"""
+
+import argparse
+import glob
+import hashlib
+import io
+import math
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+from PIL import ExifTags, Image
+from PIL import ImageFilter as PilFilter
+from PIL import ImageOps
+
+from libs import tracing
+
+# Classic sepia weights, one row per output channel (R, G, B).
+SEPIA_MATRIX = (
+    (0.393, 0.769, 0.189),
+    (0.349, 0.686, 0.168),
+    (0.272, 0.534, 0.131),
+)
+
+# Faded warm look, the fourth column is a constant offset added to the channel.
+VINTAGE_MATRIX = (
+    (0.628, 0.320, -0.040, 9.65),
+    (0.026, 0.644, 0.033, 7.46),
+    (0.047, -0.085, 0.524, 5.16),
+)
+
+
+def apply_color_matrix(img: Image.Image, matrix) -> Image.Image:
+    """
+    Apply a 3x3 color matrix to the RGB channels of an image in a single pass.
+    Rows may carry a fourth value which is added to the channel as an offset.
+
+    Pillow rounds matrix conversions to the nearest integer, so every row gets
+    a -0.5 offset to truncate like ``int()`` instead. Results saturate at 255
+    and the alpha channel is carried over untouched.
+    """
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    coefficients = []
+    for row in matrix:
+        offset = row[3] if len(row) > 3 else 0
+        coefficients.extend((*row[:3], offset - 0.5))
+    out = img.convert("RGB").convert("RGB", tuple(coefficients)).convert("RGBA")
+    out.putalpha(img.getchannel("A"))
+    return out
+
+
+# ---------------- FILTER SPECS ---------------- #
+
+
+class FilterSpec:
+    """
+    Abstract base class for declarative filter definitions, subclasses
+    implement :meth:`__call__`.
+
+    Keyword arguments given to the constructor are the default parameters of
+    the filter, they can be overridden per call.
+    """
+
+    halo = None
+    """
+    How many pixels around an output pixel the filter reads, 0 for point-wise
+    filters. None means the filter needs the whole image and cannot be tiled.
+    """
+
+    def __init__(self, **defaults) -> None:
+        self.defaults = defaults
+
+    def params(self, **params) -> dict:
+        return {**self.defaults, **params}
+
+    def __call__(self, img: Image.Image, **params) -> Image.Image:
+        """
+        Runs the filter on `img` and returns the result.
+
+        :param params: overrides of the defaults for this call, see
+            :meth:`params`
+        """
+
+
+class MatrixFilter(FilterSpec):
+    """Color matrix filter, see :func:`apply_color_matrix`."""
+
+    halo = 0
+
+    def __init__(self, matrix, **defaults) -> None:
+        super(MatrixFilter, self).__init__(**defaults)
+        self.matrix = tuple(tuple(row) for row in matrix)
+
+    def __call__(self, img: Image.Image, **params) -> Image.Image:
+        return apply_color_matrix(img, self.matrix)
+
+
+class LutFilter(FilterSpec):
+    """
+    Per-channel lookup table filter run through :meth:`PIL.Image.Image.point`.
+
+    :param curves: either one curve shared by R, G and B or a tuple of three.
+        A curve is a 256 entry sequence or a callable ``curve(value, **params)``.
+        Alpha is always left as is.
+
+    Tables are compiled once per parameter set and kept for the process.
+    """
+
+    halo = 0
+
+    def __init__(self, curves, **defaults) -> None:
+        super(LutFilter, self).__init__(**defaults)
+        if callable(curves) or len(curves) == 256:
+            curves = (curves, curves, curves)
+        self.curves = tuple(curves)
+        self._tables = {}
+
+    def table(self, **params) -> list:
+        params = self.params(**params)
+        key = tuple(sorted(params.items()))
+        table = self._tables.get(key)
+        if table is None:
+            table = []
+            for curve in self.curves:
+                if callable(curve):
+                    values = (curve(value, **params) for value in range(256))
+                else:
+                    values = curve
+                table.extend(min(max(int(value), 0), 255) for value in values)
+            table.extend(range(256))
+            self._tables[key] = table
+        return table
+
+    def __call__(self, img: Image.Image, **params) -> Image.Image:
+        if img.mode != "RGBA":
+            img = img.convert("RGBA")
+        return img.point(self.table(**params))
+
+
+class KernelFilter(FilterSpec):
+    """
+    Convolution filter built once from a Pillow kernel.
+
+    :param kernel: a :class:`PIL.ImageFilter.Kernel` (or one of the builtin
+        kernel classes) or a ``(size, weights)`` pair.
+    :param mode: mode the image is converted to before filtering.
+    """
+
+    def __init__(self, kernel, mode: str = "RGBA", **defaults) -> None:
+        super(KernelFilter, self).__init__(**defaults)
+        if isinstance(kernel, type):
+            kernel = kernel()
+        elif not isinstance(kernel, PilFilter.Filter):
+            size, weights = kernel
+            kernel = PilFilter.Kernel(size, weights)
+        self.kernel = kernel
+        self.mode = mode
+        self.halo = max(kernel.filterargs[0]) // 2
+
+    def __call__(self, img: Image.Image, **params) -> Image.Image:
+        if img.mode != self.mode:
+            img = img.convert(self.mode)
+        return img.filter(self.kernel).convert("RGBA")
+
+
+class FunctionFilter(FilterSpec):
+    """
+    Filter backed by a plain ``function(img, **params)``.
+
+    :param halo: see :attr:`FilterSpec.halo`, leave it None unless the
+        function only looks at a bounded neighbourhood of each pixel.
+    """
+
+    def __init__(self, function, halo: int | None = None, **defaults) -> None:
+        super(FunctionFilter, self).__init__(**defaults)
+        self.function = function
+        self.halo = halo
+
+    def __call__(self, img: Image.Image, **params) -> Image.Image:
+        return self.function(img, **self.params(**params))
+
+
+FILTERS = {}
+
+
+def register_filter(name: str, spec: FilterSpec) -> None:
+    """Registers a filter spec under the given name."""
+    FILTERS[name] = spec
+    _compile_stages.cache_clear()
+
+
+# ---------------- PIPELINES ---------------- #
+
+
+def normalize_pipeline(pipeline) -> tuple:
+    """
+    Normalize a pipeline into a hashable tuple of ``(name, params)`` stages.
+
+    :param pipeline: a filter name, or a sequence whose items are filter names
+        or ``(name, params)`` pairs with ``params`` a dict. List values of
+        ``params`` are passed on as tuples, other values must be hashable.
+    """
+    if isinstance(pipeline, str):
+        pipeline = (pipeline,)
+    stages = []
+    for stage in pipeline:
+        if isinstance(stage, str):
+            name, params = stage, {}
+        else:
+            name, params = stage
+        if name not in FILTERS:
+            raise ValueError(f"Filter '{name}' not supported")
+        params = tuple(
+            (key, _hashable(name, key, value))
+            for key, value in sorted(dict(params).items())
+        )
+        stages.append((name, params))
+    if not stages:
+        raise ValueError("Empty filter pipeline")
+    return tuple(stages)
+
+
+def _hashable(name: str, key: str, value):
+    if isinstance(value, list):
+        value = tuple(_hashable(name, key, item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        raise ValueError(
+            f"Parameter '{key}' of filter '{name}' must be hashable,"
+            f" not {type(value).__name__}"
+        ) from None
+    return value
+
+
+def _fuse_luts(run: list) -> tuple:
+    if len(run) == 1:
+        return run[0]
+    table = None
+    for spec, params in run:
+        step = spec.table(**params)
+        if table is None:
+            table = step
+        else:
+            table = [step[(index & ~255) + value] for index, value in enumerate(table)]
+    return LutFilter((table[:256], table[256:512], table[512:768])), {}
+
+
+@lru_cache(maxsize=64)
+def _compile_stages(stages: tuple) -> tuple:
+    compiled = []
+    run = []
+    for name, params in stages:
+        spec = FILTERS[name]
+        if isinstance(spec, LutFilter):
+            run.append((spec, dict(params)))
+            continue
+        if run:
+            compiled.append(_fuse_luts(run))
+            run = []
+        compiled.append((spec, dict(params)))
+    if run:
+        compiled.append(_fuse_luts(run))
+    return tuple(compiled)
+
+
+def compile_pipeline(pipeline) -> tuple:
+    """
+    Compile a pipeline into the ``(spec, params)`` pairs that actually run.
+
+    Adjacent lookup table stages are folded into a single table so they cost
+    one :meth:`PIL.Image.Image.point` pass. Tables saturate at every stage, so
+    the fused table gives exactly the same pixels as running them one by one.
+    Compiled pipelines are cached.
+    """
+    return _compile_stages(normalize_pipeline(pipeline))
+
+
+def run_pipeline(img: Image.Image, pipeline) -> Image.Image:
+    """Run a filter pipeline on an image and return an RGBA image."""
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    for spec, params in compile_pipeline(pipeline):
+        img = spec(img, **params)
+    return img
+
+
+# ---------------- TILING ---------------- #
+
+# Images with at least this many pixels are filtered tile by tile.
+TILED_PIXELS = 8_000_000
+TILE_SIZE = 1024
+TILE_WORKERS = os.cpu_count() or 1
+
+# Separate from the job executor, tiles are waited on from inside its jobs.
+tile_executor = ThreadPoolExecutor(
+    max_workers=TILE_WORKERS, thread_name_prefix="ImageFilterTile"
+)
+
+
+def _tile_spans(length: int, tile_size: int) -> list:
+    count = max(1, math.ceil(length / tile_size))
+    edges = [length * index // count for index in range(count + 1)]
+    return list(zip(edges, edges[1:]))
+
+
+def _filter_tile(img: Image.Image, stages: list, halo: int, box: tuple):
+    left, top, right, bottom = box
+    crop = (
+        max(0, left - halo),
+        max(0, top - halo),
+        min(img.width, right + halo),
+        min(img.height, bottom + halo),
+    )
+    tile = img.crop(crop)
+    for spec, params in stages:
+        tile = spec(tile, **params)
+    return tile.crop((left - crop[0], top - crop[1], right - crop[0], bottom - crop[1]))
+
+
+def _run_tiles(img: Image.Image, stages: list, tile_size: int) -> Image.Image:
+    # Errors of every kernel stage creep inwards from the tile border, so the
+    # halo has to cover all of them. The extra rim is cropped off afterwards.
+    halo = sum(spec.halo for spec, params in stages)
+    out = Image.new("RGBA", img.size)
+    boxes = [
+        (left, top, right, bottom)
+        for top, bottom in _tile_spans(img.height, tile_size)
+        for left, right in _tile_spans(img.width, tile_size)
+    ]
+    # Keep only a couple of tiles per worker in flight to bound memory.
+    in_flight = TILE_WORKERS * 2
+    pending = deque()
+    for box in boxes:
+        future = tile_executor.submit(_filter_tile, img, stages, halo, box)
+        pending.append((box, future))
+        if len(pending) >= in_flight:
+            done, future = pending.popleft()
+            out.paste(future.result(), done[:2])
+    for done, future in pending:
+        out.paste(future.result(), done[:2])
+    return out
+
+
+def run_tiled(img: Image.Image, pipeline, tile_size: int = TILE_SIZE) -> Image.Image:
+    """
+    Run a filter pipeline on an image tile by tile on :data:`tile_executor`.
+
+    Tiles overlap by the sum of the halos of the stages so that the stitched
+    result is exactly the one :func:`run_pipeline` gives. Stages that cannot
+    be tiled run on the whole image in between.
+    """
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    run = []
+    for spec, params in compile_pipeline(pipeline):
+        if spec.halo is not None:
+            run.append((spec, params))
+            continue
+        if run:
+            img = _run_tiles(img, run, tile_size)
+            run = []
+        img = spec(img, **params)
+    if run:
+        img = _run_tiles(img, run, tile_size)
+    return img
+
+
+# ---------------- FILTER IMPLEMENTATIONS ---------------- #
+
+
+def _grayscale(img):
+    return ImageOps.grayscale(img).convert("RGBA")
+
+
+def _scale(factor):
+    return lambda value: value * factor
+
+
+register_filter("grayscale", FunctionFilter(_grayscale, halo=0))
+register_filter("sepia", MatrixFilter(SEPIA_MATRIX))
+register_filter("vintage", MatrixFilter(VINTAGE_MATRIX))
+register_filter("warm", LutFilter((_scale(1.1), _scale(1.0), _scale(0.9))))
+register_filter("cool", LutFilter((_scale(0.9), _scale(1.0), _scale(1.1))))
+register_filter("invert", LutFilter(lambda value: 255 - value))
+register_filter(
+    "posterize",
+    LutFilter(lambda value, bits: value & ~(2 ** (8 - bits) - 1), bits=3),
+)
+register_filter(
+    "contrast",
+    LutFilter(lambda value, factor: (value - 128) * factor + 128, factor=1.5),
+)
+register_filter("blur", KernelFilter(PilFilter.BLUR))
+register_filter("sharpen", KernelFilter(PilFilter.SHARPEN))
+# FIND_EDGES and EMBOSS work best on RGB, alpha would be filtered as well.
+register_filter("edges", KernelFilter(PilFilter.FIND_EDGES, mode="RGB"))
+register_filter("emboss", KernelFilter(PilFilter.EMBOSS, mode="RGB"))
+register_filter("reflection", FunctionFilter(ImageOps.mirror))
+
+
+# ---------------- LOADING ---------------- #
+
+# Transpose undoing each EXIF orientation, from 5 on width and height swap.
+ORIENTATIONS = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+
+def open_image(source, size=None) -> Image.Image:
+    """
+    Decode an image from a path or a bytes buffer into RGBA.
+
+    :param size: optional ``(width, height)`` box the image will be displayed
+        in. The image is then decoded at the smallest resolution that still
+        fills the box once fitted into it, using JPEG draft decoding and
+        :meth:`PIL.Image.Image.reduce`, instead of at full resolution.
+
+    Photos stored sideways with an EXIF orientation tag come out upright.
+    """
+    if isinstance(source, str):
+        img = Image.open(source)
+    elif isinstance(source, (bytes, bytearray)):
+        img = Image.open(io.BytesIO(source))
+    elif isinstance(source, io.BytesIO):
+        img = Image.open(source)
+    else:
+        raise ValueError("Unsupported source type")
+
+    orientation = img.getexif().get(ExifTags.Base.Orientation, 1)
+    if size:
+        if orientation >= 5:
+            # The box is upright, the pixels are not yet.
+            size = (size[1], size[0])
+        scale = min(size[0] / img.width, size[1] / img.height)
+        if scale < 1:
+            target = (
+                max(1, math.ceil(img.width * scale)),
+                max(1, math.ceil(img.height * scale)),
+            )
+            # Only JPEG supports draft mode, other formats ignore it.
+            img.draft(None, target)
+            factor = min(img.width // target[0], img.height // target[1])
+            if factor > 1:
+                img = img.reduce(factor)
+
+    if orientation in ORIENTATIONS:
+        # Read before decoding, reduce() does not carry the EXIF data over.
+        img = img.transpose(ORIENTATIONS[orientation])
+    return img.convert("RGBA")
+
+
+def orientation(path: str) -> int:
+    """EXIF orientation of an image file, 1 when upright. Reads the header only."""
+    with Image.open(path) as img:
+        return img.getexif().get(ExifTags.Base.Orientation, 1)
+
+
+def source_key(source) -> tuple:
+    """
+    Identify an image source for caching, files by path, modification time and
+    size, buffers by a digest of their content.
+    """
+    if isinstance(source, str):
+        stat = os.stat(source)
+        return ("file", os.path.abspath(source), stat.st_mtime_ns, stat.st_size)
+    if isinstance(source, io.BytesIO):
+        source = source.getvalue()
+    if isinstance(source, (bytes, bytearray)):
+        return ("buffer", hashlib.blake2b(source, digest_size=16).digest())
+    raise ValueError("Unsupported source type")
+
+
+# ---------------- CACHE ---------------- #
+
+
+class ImageCache:
+    """
+    Thread safe LRU cache of Pillow images bounded by their total size in bytes.
+
+    Cached images are shared, callers must not modify them in place.
+    """
+
+    def __init__(self, max_bytes: int = 96 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Image.Image | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, img: Image.Image) -> None:
+        nbytes = img.width * img.height * len(img.getbands())
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self.bytes -= self._items.pop(key)[1]
+            self._items[key] = (img, nbytes)
+            self.bytes += nbytes
+            while self.bytes > self.max_bytes:
+                self.bytes -= self._items.popitem(last=False)[1][1]
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Shared by every ImageFilter, decoded sources and filtered results alike.
+image_cache = ImageCache()
+
+
+def to_pixels(img: Image.Image) -> bytes:
+    """
+    Copy an RGBA image into a buffer ready for :meth:`Texture.blit_buffer`.
+    Rows are written bottom to top, as OpenGL expects, so the texture needs no
+    :meth:`Texture.flip_vertical` and the flip costs no extra copy.
+    """
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    return img.tobytes("raw", "RGBA", 0, -1)
+
+
+# ---------------- RENDERING ---------------- #
+
+
+def render(pipeline, source, size=None, cache: ImageCache | None = image_cache):
+    """
+    Apply a filter pipeline to an image and return the resulting Pillow Image.
+    Safe to call from any thread.
+
+    :param pipeline: see :func:`normalize_pipeline`, an empty one returns the
+        decoded image
+    :param source: str (path) or bytes buffer
+    :param size: (width, height) the result is displayed at, None renders at
+        full resolution
+    :param cache: cache for decoded sources and results, None disables caching
+    """
+    stages = normalize_pipeline(pipeline) if pipeline else ()
+    if size is not None:
+        size = (int(size[0]), int(size[1]))
+    if cache is None:
+        with tracing.span("decode", "filter"):
+            decoded = open_image(source, size)
+        with tracing.span("filter", "filter", size=decoded.size):
+            return _run(decoded, stages)
+
+    key = source_key(source)
+    # Toggling back to a filter seen before skips decoding and filtering.
+    result_key = ("result", key, stages, size)
+    img = cache.get(result_key)
+    if img is None:
+        decoded_key = ("decoded", key, size)
+        decoded = cache.get(decoded_key)
+        if decoded is None:
+            with tracing.span("decode", "filter"):
+                decoded = open_image(source, size)
+            cache.put(decoded_key, decoded)
+        with tracing.span("filter", "filter", size=decoded.size):
+            img = _run(decoded, stages)
+        cache.put(result_key, img)
+    return img
+
+
+def _run(img: Image.Image, stages: tuple) -> Image.Image:
+    if not stages:
+        return img
+    if img.width * img.height >= TILED_PIXELS:
+        return run_tiled(img, stages)
+    return run_pipeline(img, stages)
+
+
+def save(img: Image.Image, destination: str, **options) -> str:
+    """
+    Save an RGBA image, the file format follows the extension of
+    `destination`. Alpha is dropped for formats that cannot store it.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+    if os.path.splitext(destination)[1].lower() in (".jpg", ".jpeg"):
+        img = img.convert("RGB")
+    img.save(destination, **options)
+    return destination
+
+
+# ---------------- COMMAND LINE ---------------- #
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff")
+
+
+def parse_pipeline(text: str) -> tuple:
+    """
+    Parse a command line pipeline such as ``warm,posterize:bits=2,blur``.
+    Stages are separated by commas, parameters follow the filter name as
+    ``:key=value`` pairs.
+    """
+    stages = []
+    for stage in text.split(","):
+        name, *pairs = stage.strip().split(":")
+        params = {}
+        for pair in pairs:
+            key, value = pair.split("=", 1)
+            for convert in (int, float, str):
+                try:
+                    params[key] = convert(value)
+                    break
+                except ValueError:
+                    continue
+        stages.append((name, params))
+    return normalize_pipeline(stages)
+
+
+def collect_inputs(patterns: list) -> list:
+    """
+    Expand directories, glob patterns and file paths into image paths.
+    :return: ``(path, relative)`` pairs, `relative` being the path from the
+        directory given or the part of the glob pattern before any wildcard
+    """
+    inputs = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            root = pattern
+            matches = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            root = os.path.dirname(pattern)
+            while glob.has_magic(root):
+                root = os.path.dirname(root)
+            matches = glob.glob(pattern, recursive=True)
+        for path in sorted(matches):
+            if os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS):
+                inputs.setdefault(path, os.path.relpath(path, root or os.curdir))
+    return list(inputs.items())
+
+
+def _process(path: str, destination: str, stages: tuple, quality: int) -> tuple:
+    img = render(stages, path, cache=None)
+    save(img, destination, quality=quality)
+    return os.path.getsize(path), os.path.getsize(destination)
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m libs.imaging",
+        description="Apply a filter pipeline to a batch of images.",
+    )
+    parser.add_argument("inputs", nargs="*", help="directories, globs or files")
+    parser.add_argument("-o", "--output", help="output directory")
+    parser.add_argument(
+        "-f",
+        "--filter",
+        default="grayscale",
+        help="pipeline, e.g. warm,posterize:bits=2,blur (default: grayscale)",
+    )
+    parser.add_argument("--format", default="png", help="output format extension")
+    parser.add_argument("--quality", type=int, default=90, help="JPEG/WebP quality")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1, help="processes"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="also redo up to date outputs"
+    )
+    parser.add_argument(
+        "-l", "--list", action="store_true", help="list the filters and exit"
+    )
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(sorted(FILTERS)))
+        return 0
+    if not args.inputs or not args.output:
+        parser.error("inputs and --output are required")
+
+    try:
+        stages = parse_pipeline(args.filter)
+    except ValueError as e:
+        parser.error(str(e))
+
+    jobs = {}
+    sources = {}
+    skipped = 0
+    extension = args.format.lower().lstrip(".")
+    for path, relative in collect_inputs(args.inputs):
+        # Subdirectories are kept so that inputs sharing a name do not
+        # overwrite each other.
+        name = os.path.splitext(relative)[0]
+        destination = os.path.normpath(os.path.join(args.output, f"{name}.{extension}"))
+        sources.setdefault(destination, []).append(path)
+        if (
+            not args.force
+            and os.path.exists(destination)
+            and os.path.getmtime(destination) >= os.path.getmtime(path)
+        ):
+            skipped += 1
+            continue
+        jobs[path] = destination
+
+    collisions = [paths for paths in sources.values() if len(paths) > 1]
+    if collisions:
+        parser.error(
+            "inputs with the same output name: "
+            + "; ".join(", ".join(paths) for paths in collisions)
+        )
+
+    done = failed = read = written = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {
+            pool.submit(_process, path, destination, stages, args.quality): path
+            for path, destination in jobs.items()
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                size_in, size_out = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[FAIL] {path}: {e}", file=sys.stderr)
+                continue
+            done += 1
+            read += size_in
+            written += size_out
+            print(f"[OK] {path} -> {jobs[path]}")
+    elapsed = max(time.perf_counter() - start, 1e-9)
+
+    print(
+        f"{done} done, {skipped} up to date, {failed} failed in {elapsed:.2f}s: "
+        f"{done / elapsed:.2f} images/s, {read / elapsed / 1e6:.2f} MB/s read, "
+        f"{written / elapsed / 1e6:.2f} MB/s written"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+On-disk cache of parsed kv files.
+
+Parsing a kv file compiles every expression in it, which is most of the cost
+of loading it. :func:`load_file` pickles the :class:`~kivy.lang.parser.Parser`
+of each file, code objects included, under a key made of the Kivy and Python
+bytecode versions, the path and the content of the file. Any change to one
+of those misses the cache and the file is parsed again. A cache file starts
+with its key and a digest of the pickle that follows, both checked before
+anything is unpickled.
+"""
+
+import copyreg
+import hashlib
+import importlib.util
+import io
+import marshal
+import os
+import pickle  # nosec
+import struct
+import types
+from functools import partial
+
+import kivy
+from kivy.factory import Factory
+from kivy.lang import Builder
+from kivy.lang.parser import Parser
+from kivy.logger import Logger
+from kivy.resources import resource_find
+
+SUFFIX = ".kvc"
+
+MAGIC = b"KVC1"
+# magic, cache key, sha256 of the pickle that follows
+HEADER = struct.Struct("<4s32s32s")
+
+
+def _reduce_code(code: types.CodeType) -> tuple:
+    # Code objects do not pickle, marshal is what .pyc files are made of.
+    return marshal.loads, (marshal.dumps(code),)
+
+
+class _Pickler(pickle.Pickler):
+    # Registered here rather than with copyreg, which would change pickling
+    # for the whole process.
+    dispatch_table = {**copyreg.dispatch_table, types.CodeType: _reduce_code}
+
+
+def cache_key(filename: str, content: str) -> str:
+    digest = hashlib.sha256()
+    for part in (kivy.__version__, importlib.util.MAGIC_NUMBER.hex(), filename):
+        digest.update(part.encode("utf-8") + b"\0")
+    digest.update(content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _read(path: str, key: str) -> Parser | None:
+    try:
+        with open(path, "rb") as cache_file:
+            data = cache_file.read()
+        magic, file_key, digest = HEADER.unpack_from(data)
+        payload = memoryview(data)[HEADER.size :]
+        if (
+            magic != MAGIC
+            or file_key != bytes.fromhex(key)
+            or hashlib.sha256(payload).digest() != digest
+        ):
+            Logger.warning(f"KVCache: Ignoring {path}: not written for this file")
+            return None
+        # Written by this app into its own data directory, checked above.
+        return pickle.loads(payload)  # nosec
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        Logger.warning(f"KVCache: Ignoring {path}: {e}")
+        return None
+
+
+def _write(path: str, key: str, parser: Parser) -> None:
+    try:
+        buffer = io.BytesIO()
+        _Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(parser)
+        payload = buffer.getbuffer()
+        with open(path + ".tmp", "wb") as cache_file:
+            digest = hashlib.sha256(payload).digest()
+            cache_file.write(HEADER.pack(MAGIC, bytes.fromhex(key), digest))
+            cache_file.write(payload)
+        os.replace(path + ".tmp", path)
+    except Exception as e:
+        Logger.warning(f"KVCache: Failed to write {path}: {e}")
+
+
+def load_file(filename: str, cache_dir: str) -> str:
+    """
+    Loads the rules of a rules only kv file like
+    :meth:`~kivy.lang.builder.BuilderBase.load_file`, from `cache_dir` when
+    it holds the file as it is now.
+    :return: name of the cache file used or written
+    """
+    filename = resource_find(filename) or filename
+    with open(filename, "r", encoding="utf-8") as kv_file:
+        content = kv_file.read()
+    key = cache_key(filename, content)
+    name = key + SUFFIX
+    path = os.path.join(cache_dir, name)
+
+    Builder._current_filename = filename
+    try:
+        parser = _read(path, key)
+        if parser is None:
+            parser = Parser(content=content, filename=filename)
+            _write(path, key, parser)
+        else:
+            # Parsing runs the #:import, #:set and #:include directives.
+            parser.execute_directives()
+
+        if parser.root:
+            raise Exception(f"The file <{filename}> contain also non-rules directives")
+
+        # As BuilderBase.load_string does with a freshly parsed file.
+        Builder.rules.extend(parser.rules)
+        Builder._clear_matchcache()
+        for rule_name, cls, template in parser.templates:
+            Builder.templates[rule_name] = (cls, template, filename)
+            Factory.register(
+                rule_name,
+                cls=partial(Builder.template, rule_name),
+                is_template=True,
+                warn=True,
+            )
+        for rule_name, baseclasses in parser.dynamic_classes.items():
+            Factory.register(
+                rule_name, baseclasses=baseclasses, filename=filename, warn=True
+            )
+        if parser.templates or parser.dynamic_classes or parser.rules:
+            Builder.files.append(filename)
+    finally:
+        Builder._current_filename = None
+    return name
+
+
+def prune(cache_dir: str, keep) -> None:
+    """Deletes the cache files in `cache_dir` not named in `keep`."""
+    keep = set(keep)
+    for name in os.listdir(cache_dir):
+        if name.endswith(SUFFIX) and name not in keep:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
@@ -1,3 +1,4 @@
+import json
 import os
 
 from android.runnable import run_on_ui_thread  # type: ignore
@@ -13,10 +14,13 @@ AppStorageDir = os.path.join(activity.getFilesDir().getAbsolutePath(), "Applicat
 
 
 @run_on_ui_thread
-def launch_client_activity(entrypoint_path: str) -> None:
+def launch_client_activity(entrypoint_path: str, params: dict | None = None) -> None:
     uri = Uri.parse("file://" + entrypoint_path)
 
     intent = Intent(activity.getApplicationContext(), ClientActivity)
     intent.setData(uri)
+    if params is not None:
+        # Read back by the entrypoint, every launch carries its own copy.
+        intent.putExtra("params", json.dumps(params))
     intent.setFlags(Intent.FLAG_ACTIVITY_NEW_TASK | Intent.FLAG_ACTIVITY_MULTIPLE_TASK)
     activity.startActivity(intent)
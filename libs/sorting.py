@@ -0,0 +1,494 @@
+"""
+Sorting algorithms as compact step traces.
+
+Kivy free, see :mod:`libs.test` for the visualizer that plays them. Every
+algorithm is a generator that records its steps into a :class:`Trace` and
+yields once per step, so a trace can be played while it is still being
+recorded. Run ``python -m libs.sorting -h`` to precompute a trace file.
+"""
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+
+# Step opcodes, names are what the visualizer colors steps by. A write step
+# stores the written value in its second field.
+COMPARE, SWAP, KEY, INSERT, WRITE = range(5)
+OPCODES = ("compare", "swap", "key", "insert", "write")
+
+
+class Trace:
+    """
+    Steps of a sort stored column wise: one opcode byte and two 32 bit index
+    fields per step, plus the values the sort started from. A step costs 9
+    bytes instead of a tuple per step, unused index fields are -1.
+
+    Traces are written with :meth:`save` and :meth:`load` maps the file back
+    without reading it, so a loaded trace is read only.
+    """
+
+    MAGIC = b"STRC"
+    VERSION = 1
+    # magic, version, byte order of the columns, value count, step count
+    HEADER = struct.Struct("<4sHcxII")
+
+    def __init__(self, values=()) -> None:
+        self.values = array("i", values)
+        self.ops = array("B")
+        self.first = array("i")
+        self.second = array("i")
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def __getitem__(self, index: int) -> tuple:
+        """Returns step `index` as ``(opcode, first, second)``."""
+        return self.ops[index], self.first[index], self.second[index]
+
+    def append(self, op: int, first: int, second: int = -1) -> None:
+        self.ops.append(op)
+        self.first.append(first)
+        self.second.append(second)
+
+    def compare(self, i: int, j: int) -> None:
+        self.append(COMPARE, i, j)
+
+    def swap(self, i: int, j: int) -> None:
+        self.append(SWAP, i, j)
+
+    def key(self, i: int) -> None:
+        self.append(KEY, i)
+
+    def insert(self, i: int, j: int) -> None:
+        self.append(INSERT, i, j)
+
+    def write(self, i: int, value: int) -> None:
+        self.append(WRITE, i, value)
+
+    def count(self, op: int, stop: int) -> int:
+        """Number of `op` steps among the first `stop`."""
+        return bytes(self.ops[:stop]).count(op)
+
+    def apply(self, values: list, start: int, stop: int) -> list:
+        """Replays steps `start` to `stop` on `values` in place."""
+        ops, first, second = self.ops, self.first, self.second
+        for index in range(start, stop):
+            op = ops[index]
+            if op == SWAP:
+                i, j = first[index], second[index]
+                values[i], values[j] = values[j], values[i]
+            elif op == WRITE:
+                values[first[index]] = second[index]
+        return values
+
+    def save(self, path: str) -> str:
+        header = self.HEADER.pack(
+            self.MAGIC,
+            self.VERSION,
+            b"<" if sys.byteorder == "little" else b">",
+            len(self.values),
+            len(self),
+        )
+        with open(path, "wb") as file:
+            file.write(header)
+            file.write(self.values)
+            file.write(self.ops)
+            # Keeps the index columns 4 byte aligned.
+            file.write(bytes(-(len(header) + len(self.ops)) % 4))
+            file.write(self.first)
+            file.write(self.second)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "Trace":
+        """Maps a trace written by :meth:`save`, its columns are memoryviews."""
+        with open(path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, order, value_count, count = cls.HEADER.unpack_from(buffer)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError(f"{path} is not a version {cls.VERSION} sort trace")
+
+        view = memoryview(buffer)
+        offset = cls.HEADER.size
+        values = view[offset : offset + value_count * 4]
+        offset += value_count * 4
+        ops = view[offset : offset + count]
+        offset += count + (-offset - count) % 4
+        first = view[offset : offset + count * 4]
+        second = view[offset + count * 4 : offset + count * 8]
+
+        trace = cls()
+        trace.ops = ops
+        if order == (b"<" if sys.byteorder == "little" else b">"):
+            trace.values = values.cast("i")
+            trace.first = first.cast("i")
+            trace.second = second.cast("i")
+        else:
+            # Written on a machine of the other byte order, copy and swap.
+            for name, column in (
+                ("values", values),
+                ("first", first),
+                ("second", second),
+            ):
+                column = array("i", column.tobytes())
+                column.byteswap()
+                setattr(trace, name, column)
+        return trace
+
+
+def bubble_sort_steps(arr: list, trace: Trace):
+    n = len(arr)
+    for i in range(n):
+        for j in range(0, n - i - 1):
+            trace.compare(j, j + 1)
+            yield
+            if arr[j] > arr[j + 1]:
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                trace.swap(j, j + 1)
+                yield
+
+
+def selection_sort_steps(arr: list, trace: Trace):
+    n = len(arr)
+    for i in range(n):
+        min_idx = i
+        for j in range(i + 1, n):
+            trace.compare(min_idx, j)
+            yield
+            if arr[j] < arr[min_idx]:
+                min_idx = j
+        if min_idx != i:
+            arr[i], arr[min_idx] = arr[min_idx], arr[i]
+            trace.swap(i, min_idx)
+            yield
+
+
+def insertion_sort_steps(arr: list, trace: Trace):
+    for i in range(1, len(arr)):
+        key = arr[i]
+        j = i - 1
+        # Highlight the key bar
+        trace.key(i)
+        yield
+        while j >= 0:
+            trace.compare(j, j + 1)
+            yield
+            if arr[j] <= key:
+                break
+            arr[j + 1] = arr[j]
+            trace.swap(j, j + 1)
+            yield
+            j -= 1
+        arr[j + 1] = key
+        trace.insert(j + 1, i)
+        yield
+
+
+def shell_sort_steps(arr: list, trace: Trace):
+    n = len(arr)
+    # Knuth's 1, 4, 13, 40... gaps
+    gap = 1
+    while gap < n // 3:
+        gap = gap * 3 + 1
+    while gap >= 1:
+        for i in range(gap, n):
+            j = i
+            while j >= gap:
+                trace.compare(j - gap, j)
+                yield
+                if arr[j - gap] <= arr[j]:
+                    break
+                arr[j - gap], arr[j] = arr[j], arr[j - gap]
+                trace.swap(j - gap, j)
+                yield
+                j -= gap
+        gap //= 3
+
+
+def _merge(arr: list, trace: Trace, lo: int, mid: int, hi: int):
+    """Merges the sorted runs arr[lo:mid] and arr[mid:hi] through a copy."""
+    left, right = arr[lo:mid], arr[mid:hi]
+    i = j = 0
+    k = lo
+    while i < len(left) and j < len(right):
+        trace.compare(lo + i, mid + j)
+        yield
+        if right[j] < left[i]:
+            arr[k] = right[j]
+            j += 1
+        else:
+            arr[k] = left[i]
+            i += 1
+        trace.write(k, arr[k])
+        yield
+        k += 1
+    # Whatever is left of the right run is already in place.
+    while i < len(left):
+        arr[k] = left[i]
+        trace.write(k, arr[k])
+        yield
+        i += 1
+        k += 1
+
+
+def merge_sort_steps(arr: list, trace: Trace):
+    # Bottom up, runs of 1, 2, 4... are merged pairwise.
+    n = len(arr)
+    width = 1
+    while width < n:
+        for lo in range(0, n - width, width * 2):
+            yield from _merge(arr, trace, lo, lo + width, min(lo + width * 2, n))
+        width *= 2
+
+
+def quick_sort_steps(arr: list, trace: Trace):
+    # Hoare partitioning around the median of the first, middle and last
+    # values, the smaller side is sorted first to bound the stack.
+    stack = [(0, len(arr) - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        if lo >= hi:
+            continue
+        mid = (lo + hi) // 2
+        pairs = ((lo, mid), (mid, hi), (lo, mid)) if hi - lo > 1 else ((lo, hi),)
+        for i, j in pairs:
+            trace.compare(i, j)
+            yield
+            if arr[j] < arr[i]:
+                arr[i], arr[j] = arr[j], arr[i]
+                trace.swap(i, j)
+                yield
+        if hi - lo < 3:
+            # Three values or less are sorted by the median of three.
+            continue
+
+        pivot, p = arr[mid], mid
+        i, j = lo - 1, hi + 1
+        while True:
+            i += 1
+            trace.compare(i, p)
+            yield
+            while arr[i] < pivot:
+                i += 1
+                trace.compare(i, p)
+                yield
+            j -= 1
+            trace.compare(j, p)
+            yield
+            while arr[j] > pivot:
+                j -= 1
+                trace.compare(j, p)
+                yield
+            if i >= j:
+                break
+            arr[i], arr[j] = arr[j], arr[i]
+            trace.swap(i, j)
+            yield
+            # Keeps highlighting the pivot where it moved to.
+            p = j if p == i else i if p == j else p
+
+        parts = sorted(((lo, j), (j + 1, hi)), key=lambda part: part[0] - part[1])
+        stack.extend(parts)
+
+
+def heap_sort_steps(arr: list, trace: Trace):
+    n = len(arr)
+
+    def sift_down(root: int, end: int):
+        while root * 2 + 1 < end:
+            child = root * 2 + 1
+            if child + 1 < end:
+                trace.compare(child, child + 1)
+                yield
+                if arr[child] < arr[child + 1]:
+                    child += 1
+            trace.compare(root, child)
+            yield
+            if arr[root] >= arr[child]:
+                return
+            arr[root], arr[child] = arr[child], arr[root]
+            trace.swap(root, child)
+            yield
+            root = child
+
+    for root in range(n // 2 - 1, -1, -1):
+        yield from sift_down(root, n)
+    for end in range(n - 1, 0, -1):
+        arr[0], arr[end] = arr[end], arr[0]
+        trace.swap(0, end)
+        yield
+        yield from sift_down(0, end)
+
+
+def counting_sort_steps(arr: list, trace: Trace):
+    if not arr:
+        return
+    low = min(arr)
+    counts = [0] * (max(arr) - low + 1)
+    for i, value in enumerate(arr):
+        trace.key(i)
+        yield
+        counts[value - low] += 1
+    k = 0
+    for offset, count in enumerate(counts):
+        for _ in range(count):
+            arr[k] = low + offset
+            trace.write(k, arr[k])
+            yield
+            k += 1
+
+
+def radix_sort_steps(arr: list, trace: Trace, base: int = 10):
+    # Least significant digit first, one stable counting pass per digit.
+    if not arr:
+        return
+    low = min(arr)
+    span = max(arr) - low
+    place = 1
+    while True:
+        buckets = [[] for _ in range(base)]
+        for i, value in enumerate(arr):
+            trace.key(i)
+            yield
+            buckets[(value - low) // place % base].append(value)
+        k = 0
+        for bucket in buckets:
+            for value in bucket:
+                arr[k] = value
+                trace.write(k, value)
+                yield
+                k += 1
+        place *= base
+        if place > span:
+            break
+
+
+def tim_sort_steps(arr: list, trace: Trace, min_run: int = 32):
+    """
+    Timsort style: natural runs are found (descending ones reversed), short
+    ones are extended to `min_run` with insertion sort, then neighbouring
+    runs are merged pairwise until one is left. No galloping.
+    """
+    n = len(arr)
+    runs = []
+    lo = 0
+    while lo < n:
+        hi = lo + 1
+        if hi < n:
+            trace.compare(lo, hi)
+            yield
+            descending = arr[hi] < arr[lo]
+            while hi + 1 < n:
+                trace.compare(hi, hi + 1)
+                yield
+                if (arr[hi + 1] < arr[hi]) != descending:
+                    break
+                hi += 1
+            hi += 1
+            if descending:
+                for i in range((hi - lo) // 2):
+                    a, b = lo + i, hi - 1 - i
+                    arr[a], arr[b] = arr[b], arr[a]
+                    trace.swap(a, b)
+                    yield
+        end = min(max(hi, lo + min_run), n)
+        for i in range(hi, end):
+            j = i
+            while j > lo:
+                trace.compare(j - 1, j)
+                yield
+                if arr[j - 1] <= arr[j]:
+                    break
+                arr[j - 1], arr[j] = arr[j], arr[j - 1]
+                trace.swap(j - 1, j)
+                yield
+                j -= 1
+        runs.append(lo)
+        lo = end
+
+    bounds = runs + [n]
+    while len(bounds) > 2:
+        merged = [0]
+        for index in range(0, len(bounds) - 2, 2):
+            yield from _merge(
+                arr, trace, bounds[index], bounds[index + 1], bounds[index + 2]
+            )
+            merged.append(bounds[index + 2])
+        if len(bounds) % 2 == 0:
+            # An odd run out waits for the next pass.
+            merged.append(bounds[-1])
+        bounds = merged
+
+
+ALGORITHMS = {
+    "bubble": bubble_sort_steps,
+    "selection": selection_sort_steps,
+    "insertion": insertion_sort_steps,
+    "shell": shell_sort_steps,
+    "merge": merge_sort_steps,
+    "quick": quick_sort_steps,
+    "heap": heap_sort_steps,
+    "counting": counting_sort_steps,
+    "radix": radix_sort_steps,
+    "tim": tim_sort_steps,
+}
+
+QUADRATIC = ("bubble", "selection", "insertion")
+
+MAX_QUADRATIC_COUNT = 2000
+"""
+Most values the visualizer runs the quadratic sorts on. It keeps the whole
+trace for seeking, which grows with the square of the count: about 40MB of
+steps and snapshots at this count, a gigabyte at 10,000.
+"""
+
+
+def check_count(algorithms, count: int) -> None:
+    """Raises ValueError when a sort in `algorithms` would keep too large a trace."""
+    if count > MAX_QUADRATIC_COUNT and any(name in QUADRATIC for name in algorithms):
+        raise ValueError(
+            f"Quadratic sorts run on at most {MAX_QUADRATIC_COUNT:,} bars,"
+            f" not {count:,}"
+        )
+
+
+def record(algorithm: str, values) -> Trace:
+    """Runs a whole sort and returns its trace."""
+    trace = Trace(values)
+    for _ in ALGORITHMS[algorithm](list(values), trace):
+        pass
+    return trace
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m libs.sorting",
+        description="Record the trace of a sort on random data.",
+    )
+    parser.add_argument("algorithm", choices=sorted(ALGORITHMS))
+    parser.add_argument("count", type=int, help="number of values")
+    parser.add_argument("-o", "--output", help="trace file (default: ALGORITHM.strc)")
+    parser.add_argument("--seed", type=int, help="random seed")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    values = [rng.randint(64, 300) for _ in range(args.count)]
+    start = time.perf_counter()
+    trace = record(args.algorithm, values)
+    elapsed = time.perf_counter() - start
+
+    path = trace.save(args.output or f"{args.algorithm}.strc")
+    print(
+        f"{len(trace)} steps in {elapsed:.2f}s,"
+        f" {os.path.getsize(path) / 2**20:.1f}MB written to {path}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""
+Headless measurements of the sorting algorithms.
+
+Kivy free like :mod:`libs.sorting`. Every algorithm is run over a range of
+sizes and input distributions, its compares, swaps and writes are counted,
+the runs are timed and the growth exponent of both is fitted on a log-log
+scale. Run ``python -m libs.sortstats -h`` for the command line, the Stats
+screen of the app charts the JSON report.
+"""
+
+import argparse
+import csv
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+from collections import deque
+
+from libs.sorting import ALGORITHMS
+
+SIZES = (128, 256, 512, 1024, 2048)
+FIELDS = ("algorithm", "distribution", "n", "compares", "swaps", "writes", "seconds")
+
+
+def _random(n: int, rng: random.Random) -> list:
+    return [rng.randint(0, n) for _ in range(n)]
+
+
+def _nearly_sorted(n: int, rng: random.Random) -> list:
+    # Sorted, then about 2% of the values swapped with a close neighbour.
+    values = sorted(_random(n, rng))
+    for _ in range(max(1, n // 50)):
+        i = rng.randrange(n)
+        j = min(n - 1, i + rng.randint(1, 8))
+        values[i], values[j] = values[j], values[i]
+    return values
+
+
+DISTRIBUTIONS = {
+    "random": _random,
+    "sorted": lambda n, rng: sorted(_random(n, rng)),
+    "reversed": lambda n, rng: sorted(_random(n, rng), reverse=True),
+    "nearly_sorted": _nearly_sorted,
+    "duplicates": lambda n, rng: [rng.randint(0, 9) for _ in range(n)],
+}
+
+
+class StepCounter:
+    """
+    Stands in for a :class:`~libs.sorting.Trace` and only counts the steps,
+    so the cost of a sort does not grow with its trace.
+    """
+
+    def __init__(self) -> None:
+        self.compares = self.swaps = self.writes = 0
+
+    def compare(self, i: int, j: int) -> None:
+        self.compares += 1
+
+    def swap(self, i: int, j: int) -> None:
+        self.swaps += 1
+
+    def write(self, i: int, value: int) -> None:
+        self.writes += 1
+
+    def key(self, i: int) -> None:
+        pass
+
+    def insert(self, i: int, j: int) -> None:
+        pass
+
+
+def measure(algorithm: str, values: list) -> dict:
+    counter = StepCounter()
+    arr = list(values)
+    start = time.perf_counter()
+    deque(ALGORITHMS[algorithm](arr, counter), maxlen=0)
+    seconds = time.perf_counter() - start
+    if arr != sorted(values):
+        raise AssertionError(f"{algorithm} sort did not sort its input")
+    return {
+        "algorithm": algorithm,
+        "n": len(values),
+        "compares": counter.compares,
+        "swaps": counter.swaps,
+        "writes": counter.writes,
+        "seconds": seconds,
+    }
+
+
+def fit_exponent(points) -> float | None:
+    """
+    Least squares slope of ``log(y)`` over ``log(n)`` for ``(n, y)`` pairs,
+    y ~ n^k gives k. None when fewer than two points are positive.
+    """
+    points = [(n, y) for n, y in points if n > 0 and y > 0]
+    if len({n for n, _ in points}) < 2:
+        return None
+    slope, _ = statistics.linear_regression(
+        [math.log(n) for n, _ in points], [math.log(y) for _, y in points]
+    )
+    return slope
+
+
+def steps(result: dict) -> int:
+    return result["compares"] + result["swaps"] + result["writes"]
+
+
+def run(
+    algorithms=None,
+    distributions=None,
+    sizes=SIZES,
+    seed: int = 50,
+    timeout: float = 5.0,
+    progress=None,
+    cancelled=None,
+) -> dict:
+    """
+    Measures every algorithm on every distribution and size.
+
+    Sizes are run in increasing order and an algorithm stops growing on a
+    distribution once one of its runs took more than `timeout` seconds.
+    `progress` is called with each result as it comes in. `cancelled` is
+    called before each run, the report stops at the runs done so far once
+    it returns True.
+    :return: report with the ``results`` and the fitted ``exponents``
+    """
+    algorithms = list(algorithms or ALGORITHMS)
+    distributions = list(distributions or DISTRIBUTIONS)
+    results = []
+    exponents = []
+    for distribution in distributions:
+        for algorithm in algorithms:
+            cases = []
+            for n in sorted(sizes):
+                if cancelled is not None and cancelled():
+                    break
+                # Same input for every algorithm at a given size.
+                rng = random.Random(f"{seed}-{distribution}-{n}")
+                result = measure(algorithm, DISTRIBUTIONS[distribution](n, rng))
+                result["distribution"] = distribution
+                cases.append(result)
+                if progress is not None:
+                    progress(result)
+                if result["seconds"] > timeout:
+                    break
+            results.extend(cases)
+            exponents.append(
+                {
+                    "algorithm": algorithm,
+                    "distribution": distribution,
+                    "steps": fit_exponent((r["n"], steps(r)) for r in cases),
+                    "seconds": fit_exponent((r["n"], r["seconds"]) for r in cases),
+                }
+            )
+
+    return {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "sizes": sorted(sizes),
+        },
+        "results": results,
+        "exponents": exponents,
+    }
+
+
+def save_json(report: dict, path: str) -> str:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=4)
+    return path
+
+
+def save_csv(report: dict, path: str) -> str:
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(report["results"])
+    return path
+
+
+def load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m libs.sortstats",
+        description="Count and time the sorting algorithms over sizes and inputs.",
+    )
+    parser.add_argument(
+        "-a", "--algorithms", help="comma separated (default: every algorithm)"
+    )
+    parser.add_argument(
+        "-d",
+        "--distributions",
+        help=f"comma separated, out of {', '.join(DISTRIBUTIONS)} (default: all)",
+    )
+    parser.add_argument(
+        "--sizes", default=",".join(str(size) for size in SIZES), help="input sizes"
+    )
+    parser.add_argument("--seed", type=int, default=50)
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=5.0,
+        help="stop growing an algorithm after a run this long (default: 5s)",
+    )
+    parser.add_argument("-o", "--output", default="sortstats.json", help="JSON report")
+    parser.add_argument("--csv", help="also write the results as CSV")
+    args = parser.parse_args(argv)
+
+    algorithms = args.algorithms.split(",") if args.algorithms else None
+    distributions = args.distributions.split(",") if args.distributions else None
+    for name in algorithms or ():
+        if name not in ALGORITHMS:
+            parser.error(f"unknown algorithm: {name}")
+    for name in distributions or ():
+        if name not in DISTRIBUTIONS:
+            parser.error(f"unknown distribution: {name}")
+
+    def progress(result: dict) -> None:
+        print(
+            f"{result['algorithm']:<10} {result['distribution']:<14}"
+            f" {result['n']:>7} {steps(result):>12} steps"
+            f" {result['seconds'] * 1000:>10.1f}ms",
+            flush=True,
+        )
+
+    report = run(
+        algorithms,
+        distributions,
+        [int(size) for size in args.sizes.split(",")],
+        args.seed,
+        args.timeout,
+        progress,
+    )
+
+    print()
+    for fit in report["exponents"]:
+        exponents = [
+            "  -  " if fit[key] is None else f"{fit[key]:.2f}"
+            for key in ("steps", "seconds")
+        ]
+        print(
+            f"{fit['algorithm']:<10} {fit['distribution']:<14}"
+            f" steps ~ n^{exponents[0]}  time ~ n^{exponents[1]}"
+        )
+    print(f"Wrote {len(report['results'])} results to {save_json(report, args.output)}")
+    if args.csv:
+        save_csv(report, args.csv)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,163 +1,872 @@
 import json
+import math
 import os
 import random
+import sys
+import time
+from array import array
+
+from kivy.config import Config
+
+if "--wait" in sys.argv[1:]:
+    # Prewarmed by the Sort screen, the window stays hidden until the
+    # parameters of the sort arrive on stdin.
+    Config.set("graphics", "window_state", "hidden")
 
 from carbonkivy.app import CarbonApp
 from carbonkivy.uix.boxlayout import CBoxLayout
-from kivy.animation import Animation
+from carbonkivy.uix.label import CLabel
 from kivy.clock import Clock
-from kivy.graphics import Color, Rectangle
+from kivy.core.window import Window
+from kivy.event import EventDispatcher
+from kivy.graphics import Color, InstructionGroup, Mesh, Rectangle
 from kivy.lang import Builder
 from kivy.metrics import dp
-from kivy.properties import StringProperty
+from kivy.properties import (
+    BooleanProperty,
+    DictProperty,
+    NumericProperty,
+    ObjectProperty,
+    OptionProperty,
+    StringProperty,
+)
 from kivy.uix.widget import Widget
+from kivy.utils import platform
+
+# Launched as a script from libs/, the app's packages live one level up.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from libs import tracing
+from libs.sorting import ALGORITHMS, COMPARE, OPCODES, SWAP, WRITE, Trace
+
+
+class BarChart(Widget):
+    """
+    Draws every bar of a chart from shared vertex buffers.
+
+    All bars are quads in one :class:`~kivy.graphics.Mesh` per 16384 bars
+    (Mesh indices are 16 bit) and share a single base color. Highlighted bars
+    get a :class:`~kivy.graphics.Rectangle` of their own drawn on top. Changing
+    a bar only rewrites its 16 floats, the buffers are handed to the GPU at
+    most once per frame.
+
+    With :attr:`lanes` above 1 the values are split into that many equal
+    lanes stacked top to bottom, still drawn from the same buffers.
+    """
+
+    BARS_PER_MESH = 16384
+
+    max_bar_width = NumericProperty(dp(16))
+
+    bar_spacing = NumericProperty(dp(4))
+
+    fill = NumericProperty(0.7)
+    """Fraction of the lane height the tallest value is drawn at."""
+
+    lanes = NumericProperty(1)
+
+    lane_spacing = NumericProperty(dp(8))
+
+    def __init__(self, values=(), color=(0, 0, 0, 1), **kwargs) -> None:
+        super(BarChart, self).__init__(**kwargs)
+        self.values = list(values)
+        self.highlights = {}
+        # Canvas instruction changes: a bar rewritten or a highlight added,
+        # recolored or removed. layout() is not counted.
+        self.updates = 0
+        self._meshes = []
+        self._vertices = []
+        self._dirty = set()
+        self._flush_trigger = Clock.create_trigger(self._flush)
+        self.color = Color(*color)
+        self._mesh_group = InstructionGroup()
+        self._highlight_group = InstructionGroup()
+        self.canvas.add(self.color)
+        self.canvas.add(self._mesh_group)
+        self.canvas.add(self._highlight_group)
+        self.bind(pos=self.layout, size=self.layout, lanes=self.layout)
+        self.layout()
+
+    def set_values(self, values) -> None:
+        """
+        Replaces every value. Only the bars whose value changed are
+        rewritten, the buffers are rebuilt only when the bar count or the
+        tallest value, which sets the scale, changes.
+        """
+        values = list(values)
+        self.clear_highlights()
+        old = self.values
+        if len(values) != len(old) or max(values, default=1) != max(old, default=1):
+            self.values = values
+            self.layout()
+            return
+
+        self.values = values
+        scale = self._scale
+        for index, (old_value, value) in enumerate(zip(old, values)):
+            if old_value != value:
+                # Only the top edge of the quad moves.
+                chunk, bar = divmod(index, self.BARS_PER_MESH)
+                vertices = self._vertices[chunk]
+                offset = bar * 16
+                vertices[offset + 9] = vertices[offset + 13] = (
+                    vertices[offset + 1] + value * scale
+                )
+                self._dirty.add(chunk)
+                self.updates += 1
+        self._flush_trigger()
+
+    def layout(self, *args) -> None:
+        """
+        Rebuilds every vertex buffer, used when the size, the bar count or
+        the scale change.
+        """
+        count = len(self.values)
+        lanes = max(1, int(self.lanes))
+        self._lane_size = max(1, -(-count // lanes))
+        self._lane_height = (self.height - self.lane_spacing * (lanes - 1)) / lanes
+        self._slot = min(
+            self.max_bar_width + self.bar_spacing, self.width / self._lane_size
+        )
+        self._bar_width = self._slot - min(self.bar_spacing, self._slot * 0.2)
+        self._scale = min(
+            dp(1), self._lane_height * self.fill / max(self.values or [1])
+        )
+
+        self._mesh_group.clear()
+        self._meshes = []
+        self._vertices = []
+        for start in range(0, count, self.BARS_PER_MESH):
+            bars = min(self.BARS_PER_MESH, count - start)
+            vertices = array("f", bytes(bars * 16 * 4))
+            indices = array("H")
+            for bar in range(bars):
+                base = bar * 4
+                indices.extend((base, base + 1, base + 2, base + 2, base + 3, base))
+            self._vertices.append(vertices)
+            self._meshes.append(
+                Mesh(vertices=vertices, indices=indices, mode="triangles")
+            )
+            self._mesh_group.add(self._meshes[-1])
+        for index in range(count):
+            self._write(index)
+        for index, (color, rect) in self.highlights.items():
+            rect.pos, rect.size = self._rect(index)
+        self._dirty = set(range(len(self._meshes)))
+        self._flush_trigger()
+
+    def _rect(self, index: int) -> tuple:
+        lane, bar = divmod(index, self._lane_size)
+        x = self.x + bar * self._slot
+        y = self.top - (lane + 1) * self._lane_height - lane * self.lane_spacing
+        return (x, y), (self._bar_width, self.values[index] * self._scale)
+
+    def _write(self, index: int) -> None:
+        (x, y), (width, height) = self._rect(index)
+        chunk, bar = divmod(index, self.BARS_PER_MESH)
+        offset = bar * 16
+        self._vertices[chunk][offset : offset + 16] = array(
+            "f",
+            (
+                x,
+                y,
+                0,
+                0,
+                x + width,
+                y,
+                0,
+                0,
+                x + width,
+                y + height,
+                0,
+                0,
+                x,
+                y + height,
+                0,
+                0,
+            ),
+        )
+        self._dirty.add(chunk)
+
+    def _flush(self, *args) -> None:
+        for chunk in self._dirty:
+            # Reassigning the buffer makes the mesh upload it again.
+            self._meshes[chunk].vertices = self._vertices[chunk]
+        self._dirty.clear()
+
+    def set_value(self, index: int, value) -> None:
+        self.values[index] = value
+        self._write(index)
+        self.updates += 1
+        if index in self.highlights:
+            rect = self.highlights[index][1]
+            rect.pos, rect.size = self._rect(index)
+            self.updates += 1
+        self._flush_trigger()
+
+    def swap(self, i: int, j: int) -> None:
+        value_i, value_j = self.values[i], self.values[j]
+        self.set_value(i, value_j)
+        self.set_value(j, value_i)
+
+    def highlight(self, index: int, rgba) -> None:
+        """Draws the bar at `index` in `rgba` until :meth:`clear_highlight`."""
+        if index in self.highlights:
+            color = self.highlights[index][0]
+            if tuple(color.rgba) != tuple(rgba):
+                color.rgba = rgba
+                self.updates += 1
+            return
+        pos, size = self._rect(index)
+        color = Color(*rgba)
+        rect = Rectangle(pos=pos, size=size)
+        self._highlight_group.add(color)
+        self._highlight_group.add(rect)
+        self.highlights[index] = (color, rect)
+        self.updates += 1
+
+    def clear_highlight(self, index: int) -> None:
+        color, rect = self.highlights.pop(index, (None, None))
+        if color is not None:
+            self._highlight_group.remove(color)
+            self._highlight_group.remove(rect)
+            self.updates += 1
+
+    def clear_highlights(self) -> None:
+        self.updates += len(self.highlights)
+        self._highlight_group.clear()
+        self.highlights = {}
+
+    def set_highlights(self, highlights: dict) -> None:
+        """
+        Makes `highlights`, a mapping of bar index to rgba, the only
+        highlighted bars. Only the bars that differ from the current
+        highlights are touched, so the cost follows the number of highlights
+        and not the number of bars.
+        """
+        for index in [index for index in self.highlights if index not in highlights]:
+            self.clear_highlight(index)
+        for index, rgba in highlights.items():
+            self.highlight(index, rgba)
+
+
+class ChartLane:
+    """
+    One lane of a :class:`BarChart` with :attr:`~BarChart.lanes`, behaving
+    like a chart of its own so a :class:`Playback` can draw into it. Every
+    lane keeps its own highlights.
+    """
+
+    def __init__(self, chart: BarChart, lane: int) -> None:
+        self.chart = chart
+        size = len(chart.values) // int(chart.lanes)
+        self.offset = lane * size
+        self.values = chart.values[self.offset : self.offset + size]
+        self.highlights = {}
+
+    @property
+    def updates(self) -> int:
+        return self.chart.updates
+
+    def set_value(self, index: int, value) -> None:
+        self.values[index] = value
+        self.chart.set_value(self.offset + index, value)
+
+    def swap(self, i: int, j: int) -> None:
+        value_i, value_j = self.values[i], self.values[j]
+        self.set_value(i, value_j)
+        self.set_value(j, value_i)
+
+    def set_values(self, values) -> None:
+        self.set_highlights({})
+        for index, value in enumerate(values):
+            if value != self.values[index]:
+                self.set_value(index, value)
+
+    def set_highlights(self, highlights: dict) -> None:
+        for index in self.highlights:
+            if index not in highlights:
+                self.chart.clear_highlight(self.offset + index)
+        for index, rgba in highlights.items():
+            self.chart.highlight(self.offset + index, rgba)
+        self.highlights = dict(highlights)
+
+
+class Player(EventDispatcher):
+    """
+    Abstract transport controls shared by :class:`Playback` and :class:`Race`,
+    which implement :meth:`advance`, :meth:`seek` and :meth:`finish`.
+
+    Steps run at :attr:`speed` steps per second. When more than one step is
+    due in a frame they are applied as one batch by :meth:`advance`, which
+    stops once it has used :attr:`frame_budget` seconds so the frame rate
+    holds at any speed.
+    """
+
+    SPEEDS = (1, 2, 5, 10, 30, 100, 300, 1000, 3000, 10000, 100000, math.inf)
+
+    speed = NumericProperty(2)
+    """Steps per second, `math.inf` runs as many as :attr:`frame_budget` allows."""
+
+    frame_budget = NumericProperty(0.008)
+    """Seconds a frame may spend applying steps."""
+
+    position = NumericProperty(0)
+    """Number of steps applied to the chart."""
+
+    length = NumericProperty(0)
+    """Number of steps known so far, the whole sort once :attr:`finished`."""
+
+    playing = BooleanProperty(False)
+
+    finished = BooleanProperty(False)
+    """True once the whole trace is recorded."""
+
+    def __init__(self, **kwargs) -> None:
+        super(Player, self).__init__(**kwargs)
+        self._due = 0
+        self._event = None
+
+    def advance(self, count: int = 1, deadline: float | None = None) -> int:
+        """
+        Applies up to `count` steps, stopping early at the end of the sort
+        or once :func:`time.perf_counter` passes `deadline`.
+        :return: number of steps applied
+        """
+
+    def seek(self, position: int) -> None:
+        """
+        Shows the chart as it is after `position` steps. Positions past the
+        end of the sort stop at the end.
+        """
+
+    def finish(self) -> None:
+        """Pauses and jumps straight to the sorted chart."""
+
+    def at_end(self) -> bool:
+        return self.finished and self.position == self.length
 
+    def play(self) -> None:
+        if self.at_end():
+            return
+        self.playing = True
+        self._due = 0
+        if self._event is None:
+            self._event = Clock.schedule_interval(self._tick, 0)
 
-class Bar(Widget):
-    def __init__(self, value, **kwargs):
-        super(Bar, self).__init__(**kwargs)
-        self.height = value
-        with self.canvas:
-            # default blue
-            self.color = Color(*CarbonApp.get_running_app().interactive[:3], 1)
-            self.rect = Rectangle(pos=self.pos, size=(self.width, self.height))
-        self.bind(pos=self.update_rect, size=self.update_rect)
+    def pause(self) -> None:
+        self.playing = False
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
 
-    def update_rect(self, *args):
-        self.rect.pos = self.pos
-        self.rect.size = (self.width, self.height)
+    def toggle(self) -> None:
+        if self.playing:
+            self.pause()
+        else:
+            self.play()
 
-    def set_color(self, crgba):
-        """Accepts a Carbon color token (RGBA list/tuple) and applies it."""
-        r, g, b, a = crgba
-        self.color.r = r
-        self.color.g = g
-        self.color.b = b
-        self.color.a = a
+    def step(self) -> None:
+        """Pauses and applies a single step."""
+        self.pause()
+        self.advance(1)
+
+    def step_back(self) -> None:
+        self.pause()
+        self.seek(self.position - 1)
+
+    def faster(self) -> None:
+        self.speed = next((s for s in self.SPEEDS if s > self.speed), self.speed)
+
+    def slower(self) -> None:
+        self.speed = next(
+            (s for s in reversed(self.SPEEDS) if s < self.speed), self.speed
+        )
+
+    def _tick(self, dt: float) -> None:
+        self._due += self.speed * dt
+        if self._due < 1:
+            return
+        deadline = time.perf_counter() + self.frame_budget
+        count = self._due if math.isinf(self._due) else int(self._due)
+        applied = self.advance(count, deadline)
+        # Steps that did not fit in the budget are dropped, not owed.
+        self._due = 0 if applied < count else self._due - applied
+
+
+class Playback(Player):
+    """
+    Plays the :class:`~libs.sorting.Trace` of a sort on a :class:`BarChart`
+    or a :class:`ChartLane`. Only the last step of a batch is highlighted.
+
+    When the trace is still being recorded, `steps` is the generator
+    recording it and steps are pulled from it only as they are needed. The
+    values are snapshotted every :attr:`snapshot_interval` steps, so
+    :meth:`seek` replays at most one interval of the trace from the nearest
+    snapshot instead of from the start.
+    """
+
+    FINISH_CHUNK = 4096
+    """Steps recorded at a time by :meth:`finish`, between deadline checks."""
+
+    compares = NumericProperty(0)
+
+    swaps = NumericProperty(0)
+
+    writes = NumericProperty(0)
+
+    elapsed = NumericProperty(0)
+    """Seconds spent in :meth:`advance`, recording and drawing steps."""
+
+    def __init__(self, chart, trace: Trace, colors: dict, steps=None, **kwargs) -> None:
+        super(Playback, self).__init__(**kwargs)
+        self.chart = chart
+        self.trace = trace
+        self.colors = colors
+        self._steps = steps
+        self.finished = steps is None
+        self.length = len(trace)
+        # Snapshots grow with the bar count, so they take about as much
+        # memory as the trace whatever the bar count.
+        self.snapshot_interval = max(256, len(chart.values))
+        self.snapshots = [array("i", chart.values)]
+        self.updates_per_step = 0
+        self._finishing = None
+        self._finish_at = 0
+        self._finish_values = None
+
+    def _record(self, count: int) -> int:
+        """Records steps until the trace holds `count`, returns its length."""
+        trace = self.trace
+        while len(trace) < count and self._steps is not None:
+            try:
+                next(self._steps)
+            except StopIteration:
+                self._steps = None
+                self.finished = True
+        return min(len(trace), count)
+
+    def _snapshot(self, position: int, values) -> None:
+        if (
+            position % self.snapshot_interval == 0
+            and position // self.snapshot_interval == len(self.snapshots)
+        ):
+            self.snapshots.append(array("i", values))
+
+    def _highlights(self, index: int) -> dict:
+        op, i, j = self.trace[index]
+        rgba = self.colors[OPCODES[op]]
+        if op in (COMPARE, SWAP):
+            return {i: rgba, j: rgba}
+        return {i: rgba}
+
+    def advance(self, count: int = 1, deadline: float | None = None) -> int:
+        self._stop_finishing()
+        start = time.perf_counter()
+        chart = self.chart
+        trace = self.trace
+        updates = chart.updates
+        position = self.position
+        counts = [0] * len(OPCODES)
+        applied = 0
+        while applied < count and self._record(position + 1) > position:
+            op = trace.ops[position]
+            if op == SWAP:
+                chart.swap(trace.first[position], trace.second[position])
+            elif op == WRITE:
+                chart.set_value(trace.first[position], trace.second[position])
+            counts[op] += 1
+            position += 1
+            applied += 1
+            self._snapshot(position, chart.values)
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+        if applied:
+            chart.set_highlights(self._highlights(position - 1))
+            self.updates_per_step = (chart.updates - updates) / applied
+            self.compares += counts[COMPARE]
+            self.swaps += counts[SWAP]
+            self.writes += counts[WRITE]
+        self.length = len(trace)
+        self.position = position
+        end = time.perf_counter()
+        self.elapsed += end - start
+        tracing.complete("sort steps", "sort", start, end, {"steps": applied})
+        if self.at_end():
+            self.pause()
+        return applied
+
+    def seek(self, position: int) -> None:
+        position = self._record(max(0, int(position)))
+        if position == self.position:
+            return
+        self._stop_finishing()
+        interval = self.snapshot_interval
+        if self.position < position <= self.position + interval:
+            values = list(self.chart.values)
+            at = self.position
+        else:
+            base = min(position // interval, len(self.snapshots) - 1)
+            values = list(self.snapshots[base])
+            at = base * interval
+        while at < position:
+            stop = min(position, (at // interval + 1) * interval)
+            self.trace.apply(values, at, stop)
+            at = stop
+            self._snapshot(at, values)
+        self.chart.set_values(values)
+        if position:
+            self.chart.set_highlights(self._highlights(position - 1))
+        self.compares = self.trace.count(COMPARE, position)
+        self.swaps = self.trace.count(SWAP, position)
+        self.writes = self.trace.count(WRITE, position)
+        self.length = len(self.trace)
+        self.position = position
+
+    def finish(self) -> None:
+        """
+        Pauses and jumps straight to the sorted chart. The rest of a trace
+        still being recorded is recorded first, over as many frames as it
+        takes, within :attr:`frame_budget` each.
+        """
+        self.pause()
+        if self.finished:
+            self.seek(len(self.trace))
+        elif self._finishing is None:
+            # Replayed along the way from the last snapshot, so the final
+            # seek only replays the last interval.
+            self._finish_at = (len(self.snapshots) - 1) * self.snapshot_interval
+            self._finish_values = list(self.snapshots[-1])
+            self._finishing = Clock.schedule_interval(self._finish_frame, 0)
+
+    def _finish_frame(self, dt: float) -> bool | None:
+        deadline = time.perf_counter() + self.frame_budget
+        interval = self.snapshot_interval
+        values = self._finish_values
+        at = self._finish_at
+        # At least one chunk a frame, however small the budget.
+        while self._steps is not None:
+            target = min(at + self.FINISH_CHUNK, (at // interval + 1) * interval)
+            stop = self._record(target)
+            self.trace.apply(values, at, stop)
+            at = stop
+            self._snapshot(at, values)
+            if time.perf_counter() > deadline:
+                break
+        self._finish_at = at
+        self.length = len(self.trace)
+        if self._steps is not None:
+            return None
+        self._stop_finishing()
+        self.seek(len(self.trace))
+        return False
+
+    def _stop_finishing(self) -> None:
+        if self._finishing is not None:
+            self._finishing.cancel()
+            self._finishing = None
+            self._finish_values = None
+
+
+class Race(Player):
+    """
+    Plays several :class:`Playback` lanes side by side, each in a
+    :class:`ChartLane` of one shared :class:`BarChart`.
+
+    In the "steps" :attr:`mode` every lane applies the same number of steps
+    per frame, in rounds of :attr:`ROUND` steps so the lanes stay in
+    lockstep when the frame budget cuts a batch short. In the "time" mode
+    every lane gets an equal share of the frame budget instead, so a lane
+    moves as fast as its steps really are.
+
+    :attr:`position` and :attr:`length` are those of the longest lane.
+    """
+
+    ROUND = 16
+
+    mode = OptionProperty("steps", options=["steps", "time"])
+
+    def __init__(self, lanes: list, **kwargs) -> None:
+        super(Race, self).__init__(**kwargs)
+        self.lanes = lanes
+        # Lanes finishing a sort still being recorded reach the end frames
+        # after finish() returns.
+        self._resync = Clock.create_trigger(self._sync)
+        for lane in lanes:
+            lane.fbind("position", self._resync)
+        self._sync()
+
+    def _sync(self, *args) -> None:
+        self.length = max(lane.length for lane in self.lanes)
+        self.position = max(lane.position for lane in self.lanes)
+        self.finished = all(lane.finished for lane in self.lanes)
+
+    def at_end(self) -> bool:
+        return all(lane.at_end() for lane in self.lanes)
+
+    def advance(self, count: int = 1, deadline: float | None = None) -> int:
+        applied = 0
+        if self.mode == "time" and deadline is not None:
+            start = time.perf_counter()
+            share = (deadline - start) / len(self.lanes)
+            for index, lane in enumerate(self.lanes):
+                applied = max(applied, lane.advance(count, start + share * (index + 1)))
+        else:
+            while applied < count:
+                chunk = min(self.ROUND, count - applied)
+                if not any([lane.advance(chunk) for lane in self.lanes]):
+                    break
+                applied += chunk
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+        self._sync()
+        if self.at_end():
+            self.pause()
+        return applied
+
+    def seek(self, position: int) -> None:
+        # The slider follows position, seeking there must not pull the lanes
+        # that are behind up to the leader.
+        if int(position) == self.position:
+            return
+        for lane in self.lanes:
+            lane.seek(position)
+        self._sync()
+
+    def step_back(self) -> None:
+        self.pause()
+        for lane in self.lanes:
+            lane.seek(lane.position - 1)
+        self._sync()
+
+    def finish(self) -> None:
+        self.pause()
+        for lane in self.lanes:
+            lane.finish()
+        self._sync()
 
 
 class SortVisualizer(CBoxLayout):
 
     name_sort = StringProperty("insertion")  # default to insertion sort
 
+    title = StringProperty()
+
+    playback = ObjectProperty()
+    """:class:`Playback` of the sort, or the :class:`Race` of several."""
+
+    race_mode = StringProperty("")
+    """:attr:`Race.mode` while racing, empty otherwise."""
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.app = CarbonApp.get_running_app()
-        self.bars = []
-        content = ""
-        with open(
-            os.path.join(os.path.dirname(__file__), "env.json"), "r", encoding="utf-8"
-        ) as env_file:
-            content = json.load(env_file)
+        content = self.app.params
         self.name_sort = content["namesort"]
         self.app.name_sort = self.name_sort
-        self.data = [random.randint(64, 300) for _ in range(15)]
+        self.colors = {
+            "compare": self.app.red_70,
+            "swap": self.app.red_50,
+            "key": self.app.yellow_50,
+            "insert": self.app.green_60,
+            "write": self.app.purple_50,
+        }
+        count = int(content.get("count", 15))
+        if content.get("race"):
+            self.start_race(content["race"], count)
+            return
 
-        for val in self.data:
-            bar = Bar(dp(val))
-            self.add_widget(bar)
-            self.bars.append(bar)
+        self.title = self.name_sort.capitalize() + " Sort"
+        if content.get("trace"):
+            # Precomputed with `python -m libs.sorting`, mapped not replayed.
+            trace = Trace.load(content["trace"])
+            steps = None
+        else:
+            trace = Trace(random.randint(64, 300) for _ in range(count))
+            steps = ALGORITHMS[self.name_sort](list(trace.values), trace)
+        self.data = list(trace.values)
 
-        self.sorting_steps = {
-            "bubble": self.bubble_sort_steps,
-            "selection": self.selection_sort_steps,
-            "insertion": self.insertion_sort_steps,
-        }
-        self.steps = list(self.sorting_steps[self.name_sort](self.data[:]))
-        Clock.schedule_interval(self.next_step, 0.5)
-
-    def bubble_sort_steps(self, arr):
-        n = len(arr)
-        for i in range(n):
-            for j in range(0, n - i - 1):
-                yield ("compare", j, j + 1)
-                if arr[j] > arr[j + 1]:
-                    arr[j], arr[j + 1] = arr[j + 1], arr[j]
-                    yield ("swap", j, j + 1)
-
-    def selection_sort_steps(self, arr):
-        n = len(arr)
-        for i in range(n):
-            min_idx = i
-            for j in range(i + 1, n):
-                yield ("compare", min_idx, j)
-                if arr[j] < arr[min_idx]:
-                    min_idx = j
-            if min_idx != i:
-                arr[i], arr[min_idx] = arr[min_idx], arr[i]
-                yield ("swap", i, min_idx)
-
-    def insertion_sort_steps(self, arr):
-        for i in range(1, len(arr)):
-            key = arr[i]
-            j = i - 1
-            # Highlight the key bar
-            yield ("key", i, None)
-            while j >= 0 and arr[j] > key:
-                yield ("compare", j, j + 1)
-                arr[j + 1] = arr[j]
-                yield ("swap", j, j + 1)
-                j -= 1
-            arr[j + 1] = key
-            yield ("insert", j + 1, i)
-
-    def next_step(self, dt):
-        if not self.steps:
-            return False
-        action, i, j = self.steps.pop(0)
-
-        # Reset all bars to blue
-        for bar in self.bars:
-            bar.set_color(self.app.blue_50)
-
-        if action == "compare":
-            self.bars[i].set_color(self.app.red_70)
-            self.bars[j].set_color(self.app.red_70)
-
-        elif action == "swap":
-            bar1, bar2 = self.bars[i], self.bars[j]
-            anim1 = Animation(x=bar2.x, duration=0.2)
-            anim2 = Animation(x=bar1.x, duration=0.2)
-            anim1.start(bar1)
-            anim2.start(bar2)
-            self.bars[i], self.bars[j] = self.bars[j], self.bars[i]
-            self.bars[i].set_color(self.app.red_50)
-            self.bars[j].set_color(self.app.red_50)
-
-        elif action == "key":
-            self.bars[i].set_color(self.app.yellow_50)
-
-        elif action == "insert":
-            self.bars[i].set_color(self.app.green_60)
+        self.chart = BarChart(values=self.data, color=self.app.blue_50)
+        self.add_widget(self.chart)
+
+        self.playback = Playback(self.chart, trace, colors=self.colors, steps=steps)
+        self.playback.play()
+
+    def start_race(self, names: list, count: int) -> None:
+        """Races the algorithms in `names` on the same data, one lane each."""
+        self.title = "Sorting race"
+        self.data = [random.randint(64, 300) for _ in range(count)]
+        self.chart = BarChart(
+            values=self.data * len(names), lanes=len(names), color=self.app.blue_50
+        )
+
+        lanes = []
+        self.lane_labels = []
+        column = CBoxLayout(
+            orientation="vertical",
+            size_hint_x=None,
+            width=dp(192),
+            spacing=self.chart.lane_spacing,
+            padding=[dp(16), 0, 0, 0],
+        )
+        for index, name in enumerate(names):
+            trace = Trace(self.data)
+            lanes.append(
+                Playback(
+                    ChartLane(self.chart, index),
+                    trace,
+                    colors=self.colors,
+                    steps=ALGORITHMS[name](list(self.data), trace),
+                )
+            )
+            label = CLabel(
+                style="body_compact_01", valign="top", adaptive=[False, False]
+            )
+            label.bind(size=label.setter("text_size"))
+            self.lane_labels.append((name, label))
+            column.add_widget(label)
+        self.add_widget(column)
+        self.add_widget(self.chart)
+
+        self.playback = Race(lanes)
+        self.race_mode = self.playback.mode
+        # Counters are redrawn at most once a frame, not on every change.
+        self._update_labels = Clock.create_trigger(self.update_lane_labels)
+        self.playback.bind(position=self._update_labels)
+        self.update_lane_labels()
+        self.playback.play()
+
+    def update_lane_labels(self, *args) -> None:
+        for (name, label), lane in zip(self.lane_labels, self.playback.lanes):
+            label.text = (
+                f"{name.capitalize()} Sort{' - done' if lane.at_end() else ''}\n"
+                f"{lane.compares:,} compares\n"
+                f"{lane.swaps:,} swaps, {lane.writes:,} writes\n"
+                f"{lane.elapsed:.2f}s"
+            )
+
+    def toggle_race_mode(self) -> None:
+        self.playback.mode = "time" if self.playback.mode == "steps" else "steps"
+        self.race_mode = self.playback.mode
+
+
+def read_params() -> dict:
+    """
+    Parameters of the visualizer: the Intent extra "params" on Android, one
+    JSON line on stdin when prewarmed with ``--wait``, env.json otherwise.
+    """
+    if platform == "android":
+        from jnius import autoclass  # type: ignore
+
+        activity = autoclass("org.kivy.android.PythonActivity").mActivity
+        extra = activity.getIntent().getStringExtra("params")
+        if extra:
+            return json.loads(extra)
+    elif "--wait" in sys.argv[1:]:
+        line = sys.stdin.readline()
+        if not line:
+            # The app closed without launching this runner.
+            sys.exit(0)
+        return json.loads(line)
+    with open(
+        os.path.join(os.path.dirname(__file__), "env.json"), "r", encoding="utf-8"
+    ) as env_file:
+        return json.load(env_file)
 
 
 class SortApp(CarbonApp):
 
     name_sort = StringProperty("insertion")
 
+    params = DictProperty({"namesort": "insertion"})
+    """Parameters from :func:`read_params`."""
+
     def build(self):
         self.app_kv = """
 CScreen:
     CLabel:
-        text: st.name_sort.capitalize() + f' Sort'
+        text: st.title
         style: "heading_05"
         halign: "center"
-        pos_hint: {"center_x": 0.5, "center_y": 0.8}
+        # Lanes fill the screen, so the title of a race sits above them.
+        pos_hint: {"center_x": 0.5, "top": 1} if st.race_mode else {"center_x": 0.5, "center_y": 0.8}
 
     SortVisualizer:
         id: st
-        orientation: "horizontal"
-        spacing: dp(4)
         size_hint: 1, 1
-        padding: [0, 0, 0, dp(64)]
+        padding: [0, dp(56) if st.race_mode else 0, 0, dp(64)]
+
+    CBoxLayout:
+        size_hint: 1, None
+        height: dp(48)
+        spacing: dp(8)
+        padding: [dp(16), 0]
+        pos_hint: {"x": 0, "y": 0}
+
+        CButtonSecondary:
+            icon: "skip--back"
+            on_press:
+                st.playback.step_back()
+
+        CButtonSecondary:
+            icon: "pause" if st.playback.playing else "play"
+            on_press:
+                st.playback.toggle()
+
+        CButtonSecondary:
+            icon: "skip--forward"
+            on_press:
+                st.playback.step()
+
+        CButtonSecondary:
+            icon: "skip--forward--filled"
+            on_press:
+                st.playback.finish()
+
+        CButtonSecondary:
+            text: {"steps": "Lockstep", "time": "Real time"}.get(st.race_mode, "")
+            size_hint_x: None
+            width: dp(112) if st.race_mode else 0
+            opacity: 1 if st.race_mode else 0
+            disabled: not st.race_mode
+            on_press:
+                st.toggle_race_mode()
+
+        CButtonSecondary:
+            icon: "subtract"
+            on_press:
+                st.playback.slower()
+
+        CLabel:
+            text: "max" if st.playback.speed == float("inf") else "%g/s" % st.playback.speed
+            size_hint_x: None
+            width: dp(64)
+            halign: "center"
+
+        CButtonSecondary:
+            icon: "add"
+            on_press:
+                st.playback.faster()
+
+        Slider:
+            min: 0
+            max: max(1, st.playback.length)
+            step: 1
+            value: st.playback.position
+            on_value:
+                st.playback.seek(self.value)
 
-<Bar>:
-    size_hint: None, None
-    width: dp(16)
+        CLabel:
+            text: "%d / %d" % (st.playback.position, st.playback.length)
+            size_hint_x: None
+            width: dp(128)
         """
         return Builder.load_string(self.app_kv)
 
 
 if __name__ == "__main__":
 
-    SortApp().run()
+    params = read_params()
+    tracing.trace_clock()
+    Window.show()
+    SortApp(params=params).run()
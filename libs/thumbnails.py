@@ -0,0 +1,183 @@
+"""
+Persistent store of image thumbnails.
+
+Picking an image only needs a preview of it at first. :class:`ThumbnailStore`
+keeps downscaled, upright copies of images on disk, keyed by the path,
+modification time and size of the original, so a file seen before shows up
+without decoding it again, even across runs. Thumbnails are made on a
+background thread with :func:`~libs.imaging.open_image`, which decodes JPEGs
+in draft mode straight at the reduced size.
+
+Pure Pillow like :mod:`libs.imaging`, the Kivy side hops back to the main
+thread itself.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+
+from PIL import Image
+
+from libs import tracing
+from libs.imaging import open_image, source_key
+
+# Longest side of a thumbnail, enough for the upload card preview on
+# high density screens.
+THUMBNAIL_SIZE = 768
+
+EXTENSIONS = (".jpg", ".png")
+
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Thumbnails")
+
+
+@lru_cache(maxsize=64)
+def thumbnail_size(path: str) -> tuple:
+    """(width, height) of a stored thumbnail, its header only is read."""
+    # Stored thumbnails never change, their name follows the original.
+    with Image.open(path) as img:
+        return img.size
+
+
+class ThumbnailStore:
+    """
+    Thread safe LRU store of thumbnails in `directory`, bounded by the total
+    size of its files in bytes. Use order is kept in the modification time
+    of the files, the least recently used are deleted first.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 32 * 1024 * 1024,
+        size: int = THUMBNAIL_SIZE,
+        executor: ThreadPoolExecutor = executor,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = size
+        self.executor = executor
+        self.bytes = 0
+        self._items = None
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def key(self, source: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((source_key(source), self.size)).encode("utf-8"))
+        return digest.hexdigest()
+
+    def find(self, source: str) -> str | None:
+        """
+        Path of the thumbnail of `source` if it is stored, which then counts
+        as used. Safe to call from the main thread, it only stats files.
+        """
+        key = self.key(source)
+        with self._lock:
+            self._load()
+            for name in (key + ext for ext in EXTENSIONS):
+                if name in self._items:
+                    self._items.move_to_end(name)
+                    path = os.path.join(self.directory, name)
+                    try:
+                        os.utime(path)
+                    except OSError:
+                        # Deleted behind our back.
+                        self.bytes -= self._items.pop(name)
+                        return None
+                    return path
+        return None
+
+    def request(self, source: str) -> Future:
+        """
+        Future of the path of the thumbnail of `source`, done right away when
+        it is stored and made in the background otherwise. Requests for a
+        thumbnail already being made share its future.
+        """
+        path = self.find(source)
+        if path is not None:
+            future = Future()
+            future.set_result(path)
+            return future
+        key = self.key(source)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self.executor.submit(self._make, key, source)
+                self._pending[key] = future
+                future.add_done_callback(lambda f: self._pending.pop(key, None))
+        return future
+
+    def make(self, source: str) -> str:
+        """Makes and stores the thumbnail of `source`, returns its path."""
+        return self._make(self.key(source), source)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._load()
+            for name in list(self._items):
+                self._remove(name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._load()
+            return {
+                "entries": len(self._items),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    # ---------------- HELPER ---------------- #
+
+    def _make(self, key: str, source: str) -> str:
+        with tracing.span("thumbnail", "filter"):
+            img = open_image(source, (self.size, self.size))
+            img.thumbnail((self.size, self.size))
+            if img.getextrema()[3][0] == 255:
+                # Opaque, JPEG is a fraction of the size of PNG.
+                name = key + ".jpg"
+                img = img.convert("RGB")
+                options = {"format": "JPEG", "quality": 85}
+            else:
+                name = key + ".png"
+                options = {"format": "PNG"}
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, name)
+            img.save(path + ".tmp", **options)
+            os.replace(path + ".tmp", path)
+
+        with self._lock:
+            self._load()
+            if name in self._items:
+                self.bytes -= self._items.pop(name)
+            self._items[name] = os.path.getsize(path)
+            self.bytes += self._items[name]
+            while self.bytes > self.max_bytes and len(self._items) > 1:
+                self._remove(next(iter(self._items)))
+        return path
+
+    def _load(self) -> None:
+        # Lock held. The directory is scanned once, on first use.
+        if self._items is not None:
+            return
+        entries = []
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(EXTENSIONS):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        except FileNotFoundError:
+            pass
+        self._items = OrderedDict((name, size) for _, name, size in sorted(entries))
+        self.bytes = sum(self._items.values())
+
+    def _remove(self, name: str) -> None:
+        # Lock held.
+        self.bytes -= self._items.pop(name)
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
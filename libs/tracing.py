@@ -0,0 +1,198 @@
+"""
+Opt-in tracing in the Chrome trace event format.
+
+Start the app with ``CAPSULE50_TRACE=trace.json`` and the startup phases,
+Clock callbacks running longer than a frame, filter jobs and sort step
+batches are recorded as timed spans, written to that file on exit. Open it
+in ``chrome://tracing`` or https://ui.perfetto.dev.
+
+Unset, :func:`span` hands out one shared no-op context manager and
+:func:`complete` returns straight away, so the calls can stay in the code.
+Kivy free apart from :func:`trace_clock`.
+"""
+
+import atexit
+import contextlib
+import itertools
+import json
+import os
+import threading
+import time
+import weakref
+
+ENV = "CAPSULE50_TRACE"
+
+path = os.environ.get(ENV, "")
+enabled = bool(path)
+
+budget = float(os.environ.get(ENV + "_BUDGET_MS", "16")) / 1000
+"""Seconds a Clock callback may run before :func:`trace_clock` records it."""
+
+_origin = time.perf_counter()
+_events = []
+_threads = {}
+_children = itertools.count(1)
+_disabled = contextlib.nullcontext()
+
+
+def complete(
+    name: str, cat: str, start: float, end: float | None = None, args=None
+) -> None:
+    """
+    Records a span from `start` to `end`, both :func:`time.perf_counter`
+    values, `end` defaults to now. Safe to call from any thread.
+    """
+    if not enabled:
+        return
+    if end is None:
+        end = time.perf_counter()
+    thread = threading.current_thread()
+    _threads[thread.native_id] = thread.name
+    event = {
+        "name": name,
+        "cat": cat,
+        "ph": "X",
+        "ts": (start - _origin) * 1e6,
+        "dur": (end - start) * 1e6,
+        "pid": os.getpid(),
+        "tid": thread.native_id,
+    }
+    if args:
+        event["args"] = args
+    # list.append is atomic, no lock needed.
+    _events.append(event)
+
+
+class _Span:
+
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name: str, cat: str, args: dict) -> None:
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        complete(self.name, self.cat, self.start, args=self.args)
+
+
+def span(name: str, cat: str = "app", /, **args):
+    """Context manager recording the time spent in its block."""
+    if not enabled:
+        return _disabled
+    return _Span(name, cat, args)
+
+
+def child_path(label: str) -> str:
+    """Trace file for a child process, next to this one's."""
+    root, ext = os.path.splitext(os.path.abspath(path))
+    return f"{root}-{label}-{next(_children)}{ext or '.json'}"
+
+
+def save(destination: str | None = None) -> str:
+    destination = destination or path
+    events = list(_events)
+    for tid, name in list(_threads.items()):
+        events.append(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": {"name": name},
+            }
+        )
+    with open(destination, "w", encoding="utf-8") as trace_file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+    return destination
+
+
+class _TimedCallback:
+    """Runs a Clock callback, recording it when it takes over :data:`budget`."""
+
+    __slots__ = ("callback", "ref", "release_ref", "hash", "name")
+
+    def __init__(self, callback, release_ref: bool = True) -> None:
+        # Held strongly until its first run, then bound methods weakly, the
+        # way ClockEvent holds its callback.
+        self.callback = callback
+        self.ref = None
+        self.release_ref = release_ref
+        self.hash = hash(callback)
+        self.name = getattr(callback, "__qualname__", None) or repr(callback)
+
+    def get_callback(self):
+        if self.callback is not None:
+            return self.callback
+        return self.ref()
+
+    def release(self) -> None:
+        try:
+            self.ref = weakref.WeakMethod(self.callback)
+        except TypeError:
+            # Not a bound method, nothing else would keep it alive.
+            self.release_ref = False
+            return
+        self.callback = None
+
+    def __call__(self, *args):
+        callback = self.get_callback()
+        if callback is None:
+            # Its instance is gone, an interval stops there.
+            return False
+        start = time.perf_counter()
+        try:
+            return callback(*args)
+        finally:
+            end = time.perf_counter()
+            if end - start > budget:
+                complete(self.name, "clock", start, end)
+            if self.release_ref and self.callback is not None:
+                self.release()
+
+    # Clock.unschedule(callback) finds events by comparing callbacks.
+    def __eq__(self, other) -> bool:
+        if isinstance(other, _TimedCallback):
+            other = other.get_callback()
+        callback = self.get_callback()
+        return callback is not None and callback == other
+
+    def __hash__(self) -> int:
+        return self.hash
+
+
+def trace_clock(clock=None) -> None:
+    """
+    Makes the callbacks scheduled on the Kivy Clock from now on recorded
+    when they run longer than :data:`budget`. Does nothing when disabled.
+    """
+    if not enabled:
+        return
+    if clock is None:
+        from kivy.clock import Clock as clock
+
+    for name in ("schedule_once", "schedule_interval", "create_trigger"):
+        original = getattr(clock, name)
+
+        def schedule(callback, *args, _original=original, **kwargs):
+            release_ref = kwargs.get("release_ref", True)
+            return _original(_TimedCallback(callback, release_ref), *args, **kwargs)
+
+        setattr(clock, name, schedule)
+
+
+def _save_at_exit() -> None:
+    import multiprocessing
+
+    # Workers of a process pool are not the traced app, they would
+    # overwrite its file. Runners exiting unused have nothing to write.
+    if _events and multiprocessing.parent_process() is None:
+        save()
+
+
+if enabled:
+    atexit.register(_save_at_exit)
@@ -11,6 +11,10 @@ and modernize.
 # ==========================
 import os
 import sys
+import time
+
+# Before Kivy, the first import of it is most of the cost.
+imports_started = time.perf_counter()
 
 from kivy.resources import resource_add_path
 
@@ -19,11 +23,13 @@ os.environ["devicetype"] = "mobile"
 sys.path.insert(0, os.path.dirname(__file__))
 resource_add_path(os.path.dirname(__file__))
 
+from libs import tracing
+
 import ssl
 import webbrowser
+from functools import cached_property, partial
 
 from carbonkivy.app import CarbonApp
-from carbonkivy.uix.screenmanager import CScreenManager
 from carbonkivy.utils import update_system_ui
 
 # ==========================
@@ -31,13 +37,19 @@ from carbonkivy.utils import update_system_ui
 # ==========================
 from kivy.clock import Clock, mainthread
 from kivy.core.window import Window
+from kivy.logger import Logger
 
 import registers
 
 # ==========================
 # Custom Module Imports
 # ==========================
+from libs import kvcache
 from View.base_screen import LoadingLayout
+from View.screen_manager import LazyScreenManager
+
+tracing.complete("imports", "startup", imports_started)
+tracing.trace_clock()
 
 # ==========================
 # SSL Configuration
@@ -56,9 +68,8 @@ def set_softinput(*args) -> None:
 Window.on_restore(Clock.schedule_once(set_softinput, 0.1))
 
 
-class UI(CScreenManager):
-    def __init__(self, *args, **kwargs):
-        super(UI, self).__init__(*args, **kwargs)
+class UI(LazyScreenManager):
+    """Top level screen manager and the one inside the entrypoint screen."""
 
 
 class Capsule50(CarbonApp):
@@ -66,9 +77,42 @@ class Capsule50(CarbonApp):
     def __init__(self, **kwargs):
         self.theme = "White"
         super(Capsule50, self).__init__(**kwargs)
-        self.load_all_kv_files(os.path.join(self.directory, "View"))
+        with tracing.span("load kv files", "startup"):
+            self.load_all_kv_files(os.path.join(self.directory, "View"))
         self.loading_layout = LoadingLayout()
 
+    def load_all_kv_files(self, directory: str, *args) -> None:
+        """
+        Loads every kv file under `directory` as CarbonApp does, through the
+        cache of parsed rules in :mod:`libs.kvcache`.
+        """
+        start = time.perf_counter()
+        try:
+            # user_data_dir creates its directory on first access, so it can
+            # fail on a read-only home as well.
+            cache_dir = os.path.join(self.user_data_dir, "kvcache")
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError:
+            return super(Capsule50, self).load_all_kv_files(directory, *args)
+
+        used = []
+        for root, _, files in os.walk(directory):
+            for file in files:
+                if os.path.splitext(file)[1] == ".kv":
+                    used.append(kvcache.load_file(os.path.join(root, file), cache_dir))
+        kvcache.prune(cache_dir, used)
+        Logger.info(
+            f"KVCache: Loaded {len(used)} kv files in "
+            f"{(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+
+    @cached_property
+    def thumbnails(self) -> object:
+        """:class:`~libs.thumbnails.ThumbnailStore` of the images picked in the app."""
+        from libs.thumbnails import ThumbnailStore
+
+        return ThumbnailStore(os.path.join(self.user_data_dir, "thumbnails"))
+
     def on_theme(self, *args) -> None:
         super(Capsule50, self).on_theme(*args)
         icon_style = "Dark" if (self.theme in ["White", "Gray10"]) else "Light"
@@ -76,24 +120,39 @@ class Capsule50(CarbonApp):
 
     def build(self) -> UI:
         # This is the screen manager that will contain all the screens of your application.
-        self.manager_screens = UI()
-        self.generate_application_screens()
+        with tracing.span("build", "startup"):
+            self.manager_screens = UI()
+            self.generate_application_screens()
         return self.manager_screens
 
     def generate_application_screens(self) -> None:
-        # adds different screen widgets to the screen manager
+        # registers the screens with the screen manager, each one is created
+        # on first navigation or in idle time after the first one
         import View.screens
 
         screens = View.screens.screens
+        self.models = {}
+
+        for name_screen in screens.keys():
+            self.manager_screens.lazy_screens[name_screen] = partial(
+                self.create_screen, name_screen
+            )
+        self.referrer(next(iter(screens)))
 
-        for i, name_screen in enumerate(screens.keys()):
-            model = screens[name_screen]["model"]()
-            view = screens[name_screen]["object"](view_model=model)
-            model.add_observer(view)
-            view.manager_screens = self.manager_screens
-            view.name = name_screen
+    def create_screen(self, name_screen: str) -> object:
+        import View.screens
 
-            self.manager_screens.add_widget(view)
+        screen = View.screens.screens[name_screen]
+        # Models are kept when their view is unloaded, a rebuilt view picks
+        # up where the last one left off.
+        if name_screen not in self.models:
+            self.models[name_screen] = screen["model"]()
+        model = self.models[name_screen]
+        view = screen["object"](view_model=model)
+        model.add_observer(view)
+        view.manager_screens = self.manager_screens
+        view.name = name_screen
+        return view
 
     def referrer(self, destination: str = None) -> None:
         if self.manager_screens.current != destination:
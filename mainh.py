@@ -8,7 +8,6 @@ import webbrowser
 
 from carbonkivy.app import CarbonApp
 from carbonkivy.devtools import LiveApp
-from carbonkivy.uix.screenmanager import CScreenManager
 from kivy.clock import Clock, mainthread
 from kivy.core.window import Window
 from kivy.properties import ColorProperty
@@ -17,6 +16,7 @@ from kivy.uix.screenmanager import FadeTransition as FT
 
 import registers
 from View.base_screen import LoadingLayout
+from View.screen_manager import LazyScreenManager
 
 sys.path.insert(0, os.path.dirname(__file__))
 resource_add_path(os.path.dirname(__file__))
@@ -38,7 +38,7 @@ Window.top = 30
 Window.left = resolution[0] - Window.width + 5
 
 
-class UI(CScreenManager):
+class UI(LazyScreenManager):
 
     def __init__(self, *args, **kwargs) -> None:
         super(UI, self).__init__(*args, **kwargs)
@@ -1,37 +1,73 @@
-import glob
-import importlib
+import json
 import os
 
 from kivy.factory import Factory
+from kivy.logger import Logger
 
-view_path = os.path.join(os.path.dirname(__file__), "View")
-component_dir_pattern = os.path.join(view_path, "**", "components")
+from libs import tracing
 
-component_dirs = glob.glob(component_dir_pattern, recursive=True)
+view_path = os.path.join(os.path.dirname(__file__), "View")
+manifest_path = os.path.join(os.path.dirname(__file__), "components.json")
 
 """
 Registers custom components to the Kivy Factory.
 
-Below code searches for all directories named "components" within the "View" directory and registers each component to the Kivy Factory. 
+Below code finds all directories named "components" within the "View" directory and registers each component to the Kivy Factory. 
 Once registered, the components can be used without explicitly importing them elsewhere in the kvlang files.
+
+Components are registered by module path, so a component's module is only imported the first time kvlang builds one.
+The scan of the "View" directory is cached in "components.json" along with the mtime of every directory scanned,
+adding, removing or renaming anything in those directories makes the next start scan again.
 """
 
-for component_path in component_dirs:
-    for component in os.listdir(component_path):
-        target_dir = os.path.join(component_path, component)
-
-        if component != "__pycache__" and os.path.isdir(target_dir):
-            module_name = os.path.basename(target_dir)
-            module_import_path = (
-                f"View.{os.path.relpath(target_dir, view_path).replace(os.sep, '.')}"
-            )
-
-            try:
-                module = importlib.import_module(module_import_path)
-                Factory.register(module_name, cls=getattr(module, module_name))
-                print(f"Registered {module_name} from {module_import_path}")
-            except Exception as e:
-                print(f"Failed to register {module_name}: {e}")
+
+def scan_components() -> dict:
+    directories = {}
+    components = {}
+    for root, dirs, _ in os.walk(view_path):
+        dirs[:] = sorted(name for name in dirs if name != "__pycache__")
+        directories[os.path.relpath(root, view_path)] = os.stat(root).st_mtime_ns
+        if os.path.basename(root) == "components":
+            for component in dirs:
+                target_dir = os.path.join(root, component)
+                components[component] = (
+                    f"View.{os.path.relpath(target_dir, view_path).replace(os.sep, '.')}"
+                )
+    return {"directories": directories, "components": components}
+
+
+def load_manifest() -> dict | None:
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+        for directory, mtime in manifest["directories"].items():
+            if os.stat(os.path.join(view_path, directory)).st_mtime_ns != mtime:
+                return None
+        return manifest
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_manifest(manifest: dict) -> None:
+    try:
+        with open(manifest_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=4)
+    except OSError as e:
+        # Read only install, the directories are scanned on every start.
+        Logger.warning(f"Registers: Failed to save {manifest_path}: {e}")
+
+
+with tracing.span("register components", "startup"):
+    manifest = load_manifest()
+    if manifest is None:
+        manifest = scan_components()
+        save_manifest(manifest)
+
+    for module_name, module_import_path in manifest["components"].items():
+        Factory.register(module_name, module=module_import_path)
+        Logger.debug(
+            "Registers: Registered %s from %s", module_name, module_import_path
+        )
 
 """
 Registers custom fonts to the Kivy LabelBase.
@@ -0,0 +1,60 @@
+import pytest
+
+pytest.importorskip("carbonkivy")
+
+from kivy.clock import Clock
+from kivy.event import EventDispatcher
+from kivy.properties import StringProperty
+
+from Model.base_model import BaseScreenModel
+
+
+class View(EventDispatcher):
+
+    name = StringProperty()
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.changes = []
+
+    def model_is_changed(self, changed_fields):
+        self.changes.append(set(changed_fields))
+
+
+def test_notifications_coalesce_per_frame():
+    model = BaseScreenModel()
+    first, second, other = View(name="home"), View(name="home"), View(name="sort")
+    for view in (first, second, other):
+        model.add_observer(view)
+
+    model.notify_observers("home", ["count"])
+    model.notify_observers("home", ("title", "count"))
+    model.notify_observers("nobody", ["count"])
+    assert first.changes == []
+
+    Clock.tick()
+    assert first.changes == [{"count", "title"}]
+    assert second.changes == [{"count", "title"}]
+    assert other.changes == []
+
+    Clock.tick()
+    assert first.changes == [{"count", "title"}]
+
+
+def test_observers_indexed_by_name():
+    model = BaseScreenModel()
+    view = View()
+    model.add_observer(view)
+    # Named after being added.
+    view.name = "stats"
+    model.notify_observers("stats", ["rows"])
+    model.dispatch_changes()
+    assert view.changes == [{"rows"}]
+
+    model.notify_observers("stats", ["rows"])
+    model.remove_observer(view)
+    assert "stats" not in model._observers_by_name
+    Clock.tick()
+    assert view.changes == [{"rows"}]
+    view.name = "other"
+    assert "other" not in model._observers_by_name
@@ -0,0 +1,108 @@
+import random
+
+import pytest
+from PIL import Image, ImageChops
+
+from libs.imaging import (
+    FILTERS,
+    SEPIA_MATRIX,
+    LutFilter,
+    apply_color_matrix,
+    compile_pipeline,
+    normalize_pipeline,
+    run_pipeline,
+    run_tiled,
+)
+
+
+def random_image(size: tuple, seed: int, mode: str = "RGBA") -> Image.Image:
+    rng = random.Random(seed)
+    bands = len(Image.new(mode, (1, 1)).getbands())
+    return Image.frombytes(mode, size, rng.randbytes(size[0] * size[1] * bands))
+
+
+def max_difference(first: Image.Image, second: Image.Image) -> int:
+    assert first.size == second.size
+    diff = ImageChops.difference(first.convert("RGBA"), second.convert("RGBA"))
+    return max(high for _, high in diff.getextrema())
+
+
+def run_unfused(img: Image.Image, pipeline) -> Image.Image:
+    """Runs every stage on its own, as before stages were compiled."""
+    img = img.convert("RGBA")
+    for name, params in normalize_pipeline(pipeline):
+        img = FILTERS[name](img, **dict(params))
+    return img
+
+
+def sepia_loop(img: Image.Image) -> Image.Image:
+    """Sepia as ImageFilter._sepia computed it before the matrix conversion."""
+    sepia_img = img.convert("RGBA")
+    pixels = sepia_img.load()
+    for y in range(sepia_img.height):
+        for x in range(sepia_img.width):
+            r, g, b, a = pixels[x, y]
+            tr = int(0.393 * r + 0.769 * g + 0.189 * b)
+            tg = int(0.349 * r + 0.686 * g + 0.168 * b)
+            tb = int(0.272 * r + 0.534 * g + 0.131 * b)
+            pixels[x, y] = (min(tr, 255), min(tg, 255), min(tb, 255), a)
+    return sepia_img
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_sepia_matches_pixel_loop(seed):
+    img = random_image((97, 61), seed)
+    expected = sepia_loop(img)
+    assert max_difference(apply_color_matrix(img, SEPIA_MATRIX), expected) <= 1
+    assert max_difference(run_pipeline(img, "sepia"), expected) <= 1
+
+
+@pytest.mark.parametrize("mode", ["RGB", "L"])
+def test_sepia_accepts_other_modes(mode):
+    img = random_image((40, 30), 7, mode)
+    assert max_difference(run_pipeline(img, "sepia"), sepia_loop(img)) <= 1
+
+
+@pytest.mark.parametrize(
+    "pipeline",
+    [
+        ("warm", "invert"),
+        ("warm", "cool", ("posterize", {"bits": 2}), "invert"),
+        (("contrast", {"factor": 1.8}), "warm", "warm", "warm"),
+        ("invert", "sepia", "cool", ("posterize", {"bits": 3})),
+    ],
+)
+def test_fused_luts_match_unfused(pipeline):
+    img = random_image((53, 41), 11)
+    compiled = compile_pipeline(pipeline)
+    # Every run of adjacent lookup tables is folded into one.
+    for (first, _), (second, _) in zip(compiled, compiled[1:]):
+        assert not (isinstance(first, LutFilter) and isinstance(second, LutFilter))
+    assert max_difference(run_pipeline(img, pipeline), run_unfused(img, pipeline)) == 0
+
+
+@pytest.mark.parametrize(
+    "pipeline",
+    [
+        "blur",
+        ("sharpen", "edges"),
+        ("warm", "blur", "reflection", "emboss", "grayscale"),
+        ("sepia", "blur", "blur", ("posterize", {"bits": 2})),
+    ],
+)
+def test_tiled_matches_untiled(pipeline):
+    # Tiles far smaller than the image, with an uneven last row and column.
+    img = random_image((203, 147), 5)
+    tiled = run_tiled(img, pipeline, tile_size=37)
+    assert max_difference(tiled, run_pipeline(img, pipeline)) == 0
+
+
+def test_list_params_become_tuples():
+    stages = normalize_pipeline([("posterize", {"bits": 2, "extra": [1, [2, 3]]})])
+    assert stages == (("posterize", (("bits", 2), ("extra", (1, (2, 3))))),)
+    hash(stages)
+
+
+def test_unhashable_params_rejected():
+    with pytest.raises(ValueError, match="'extra' of filter 'posterize'"):
+        normalize_pipeline([("posterize", {"extra": {"a": 1}})])
@@ -0,0 +1,53 @@
+import os
+
+from PIL import Image
+
+from libs.imaging import ImageCache, render
+
+
+def image(width: int, height: int = 10) -> Image.Image:
+    return Image.new("RGBA", (width, height))
+
+
+def test_evicts_least_recently_used_by_bytes():
+    # Each 10x10 RGBA image is 400 bytes.
+    cache = ImageCache(max_bytes=1000)
+    cache.put("a", image(10))
+    cache.put("b", image(10))
+    assert cache.get("a") is not None
+    cache.put("c", image(10))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    stats = cache.stats()
+    assert stats["bytes"] == 800 and stats["entries"] == 2
+    assert stats["evictions"] == 1
+
+
+def test_skips_images_larger_than_the_cache():
+    cache = ImageCache(max_bytes=1000)
+    cache.put("small", image(10))
+    cache.put("huge", image(100))
+    assert cache.get("huge") is None
+    assert cache.get("small") is not None
+
+
+def test_replacing_a_key_counts_its_bytes_once():
+    cache = ImageCache(max_bytes=10_000)
+    cache.put("a", image(10))
+    cache.put("a", image(20))
+    assert cache.stats()["bytes"] == 800
+
+
+def test_render_reuses_results_until_the_file_changes(tmp_path):
+    path = str(tmp_path / "source.png")
+    Image.new("RGB", (32, 32), (200, 100, 50)).save(path)
+    cache = ImageCache()
+    first = render("invert", path, cache=cache)
+    assert render("invert", path, cache=cache) is first
+
+    Image.new("RGB", (32, 32), (10, 20, 30)).save(path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    second = render("invert", path, cache=cache)
+    assert second is not first
+    assert second.getpixel((0, 0)) == (245, 235, 225, 255)
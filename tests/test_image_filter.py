@@ -0,0 +1,125 @@
+from concurrent.futures import Future
+
+import pytest
+
+pytest.importorskip("carbonkivy")
+
+from kivy.clock import Clock
+from kivy.core.window import Window  # noqa: F401, textures need a GL context
+from PIL import Image
+
+from libs.filter import ImageFilter
+from libs.imaging import orientation
+
+
+def make_source(tmp_path, size=(40, 30)):
+    path = str(tmp_path / "source.png")
+    Image.new("RGBA", size, (200, 120, 40, 255)).save(path)
+    return path
+
+
+def test_export_without_filter_saves_original(tmp_path):
+    source = make_source(tmp_path)
+    destination = str(tmp_path / "exports" / "original.png")
+    assert ImageFilter().export("", source, destination) == destination
+    with Image.open(destination) as img:
+        assert img.size == (40, 30)
+        assert img.getpixel((0, 0)) == (200, 120, 40, 255)
+
+
+def test_export_with_filter(tmp_path):
+    source = make_source(tmp_path)
+    destination = str(tmp_path / "inverted.png")
+    ImageFilter().export("invert", source, destination)
+    with Image.open(destination) as img:
+        assert img.getpixel((0, 0))[:3] == (55, 135, 215)
+
+
+def test_render_without_filter_is_upright(tmp_path):
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    source = str(tmp_path / "sideways.jpg")
+    Image.new("RGB", (40, 30)).save(source, exif=exif)
+    assert orientation(source) == 6
+    assert ImageFilter().render("", source).size == (30, 40)
+    assert ImageFilter().render("", source, size=(15, 20)).size == (15, 20)
+
+
+class ManualExecutor:
+    """Runs submitted jobs when the test says so, in any order."""
+
+    def __init__(self):
+        self.jobs = []
+        self.results = {}
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.jobs.append((future, fn, args))
+        return future
+
+    def run(self, index):
+        """Run a job to the end without reporting it, False if cancelled."""
+        future, fn, args = self.jobs[index]
+        if not future.set_running_or_notify_cancel():
+            return False
+        self.results[index] = fn(*args)
+        return True
+
+    def finish(self, index):
+        self.jobs[index][0].set_result(self.results[index])
+
+
+def make_filter(tmp_path):
+    ft = ImageFilter()
+    ft.executor = ManualExecutor()
+    ft.uploads = []
+    ft._upload = lambda size, pixels: ft.uploads.append(pixels[:4])
+    return ft, make_source(tmp_path)
+
+
+def test_newer_apply_supersedes_running_job(tmp_path):
+    ft, source = make_filter(tmp_path)
+    ft.apply("invert", source)
+    assert ft.executor.run(0)
+    ft.apply("grayscale", source)
+    assert ft.pending == 2
+
+    assert ft.executor.run(1)
+    ft.executor.finish(1)
+    # The older job is reported last, it must not replace the newer result.
+    ft.executor.finish(0)
+    Clock.tick()
+    assert ft.uploads == [ft.executor.results[1][1][:4]]
+    assert ft.executor.results[0][1][:4] != ft.uploads[0]
+    assert ft.pending == 0
+
+
+def test_newer_apply_cancels_queued_job(tmp_path):
+    ft, source = make_filter(tmp_path)
+    ft.apply("invert", source)
+    ft.apply("grayscale", source)
+    assert ft.executor.jobs[0][0].cancelled()
+    assert not ft.executor.run(0)
+    assert ft.executor.run(1)
+    ft.executor.finish(1)
+    Clock.tick()
+    assert ft.uploads == [ft.executor.results[1][1][:4]]
+    assert ft.pending == 0
+
+
+def test_upload_reuses_texture_of_same_size():
+    ft = ImageFilter()
+    textures = []
+    ft.bind(texture=lambda instance, texture: textures.append(texture))
+
+    ft._upload((4, 3), bytes(4 * 3 * 4))
+    first = ft.texture
+    ft._upload((4, 3), bytes([255]) * (4 * 3 * 4))
+    assert ft.texture is first
+    # Observers hear about the same texture refilled.
+    assert textures == [first, first]
+
+    ft._upload((5, 3), bytes(5 * 3 * 4))
+    assert ft.texture is not first
+    assert tuple(ft.texture.size) == (5, 3)
+    assert textures[-1] is ft.texture
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+from PIL import Image
+
+from libs.imaging import main
+
+
+def make(path) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.new("RGB", (8, 8), (10, 200, 30)).save(path)
+    return str(path)
+
+
+def test_keeps_the_directories_of_inputs(tmp_path):
+    make(tmp_path / "in" / "a" / "x.png")
+    make(tmp_path / "in" / "b" / "x.png")
+    make(tmp_path / "in" / "top.jpg")
+    out = tmp_path / "out"
+    pattern = str(tmp_path / "in" / "**" / "*.*")
+    assert main([pattern, "-o", str(out), "-j", "1"]) == 0
+    assert sorted(
+        os.path.relpath(os.path.join(root, name), out)
+        for root, _, names in os.walk(out)
+        for name in names
+    ) == [os.path.join("a", "x.png"), os.path.join("b", "x.png"), "top.png"]
+
+
+def test_refuses_inputs_with_the_same_output(tmp_path, capsys):
+    first = make(tmp_path / "a" / "x.png")
+    second = make(tmp_path / "a" / "x.jpg")
+    with pytest.raises(SystemExit):
+        main([first, second, "-o", str(tmp_path / "out")])
+    assert "same output name" in capsys.readouterr().err
+    assert not (tmp_path / "out").exists()
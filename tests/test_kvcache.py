@@ -0,0 +1,83 @@
+import copyreg
+import itertools
+import os
+import pickle
+import types
+
+import pytest
+
+from kivy.factory import Factory
+from kivy.lang import Builder
+
+from libs import kvcache
+
+KV = """
+<KVCacheTest{index}@Widget>:
+    size_hint: None, None
+    width: self.height * {index}
+"""
+
+# Rules stay registered with the Factory, every test gets a class of its own.
+indexes = itertools.count(2)
+
+
+@pytest.fixture
+def kv_file(tmp_path):
+    index = next(indexes)
+    path = tmp_path / f"test{index}.kv"
+    path.write_text(KV.format(index=index), encoding="utf-8")
+    yield str(path), f"KVCacheTest{index}", index
+    Builder.unload_file(str(path))
+
+
+def make(name):
+    widget = Factory.get(name)()
+    widget.height = 10
+    return widget
+
+
+def test_cache_round_trip(tmp_path, kv_file, monkeypatch):
+    filename, name, index = kv_file
+    cache_dir = str(tmp_path / "cache")
+    os.makedirs(cache_dir)
+
+    cache_name = kvcache.load_file(filename, cache_dir)
+    assert os.listdir(cache_dir) == [cache_name]
+    assert make(name).width == 10 * index
+    Builder.unload_file(filename)
+    Factory.unregister(name)
+
+    def parse(*args, **kwargs):
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr(kvcache, "Parser", parse)
+    assert kvcache.load_file(filename, cache_dir) == cache_name
+    assert make(name).width == 10 * index
+
+
+@pytest.mark.parametrize("offset", [0, 10, 40, -1])
+def test_damaged_cache_is_parsed_again(tmp_path, kv_file, offset):
+    filename, name, index = kv_file
+    cache_dir = str(tmp_path / "cache")
+    os.makedirs(cache_dir)
+    cache_name = kvcache.load_file(filename, cache_dir)
+    path = os.path.join(cache_dir, cache_name)
+    Builder.unload_file(filename)
+    Factory.unregister(name)
+
+    # Magic, key, digest or pickle.
+    with open(path, "r+b") as cache_file:
+        data = bytearray(cache_file.read())
+        data[offset] ^= 0xFF
+        cache_file.seek(0)
+        cache_file.write(data)
+
+    assert kvcache._read(path, cache_name[: -len(kvcache.SUFFIX)]) is None
+    kvcache.load_file(filename, cache_dir)
+    assert make(name).width == 10 * index
+
+
+def test_code_objects_pickle_only_in_cache_files():
+    assert types.CodeType not in copyreg.dispatch_table
+    with pytest.raises(TypeError):
+        pickle.dumps(compile("1", "<test>", "eval"))
@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+pytest.importorskip("carbonkivy")
+
+from kivy.clock import Clock
+
+from libs.sorting import ALGORITHMS, OPCODES, Trace
+from libs.test import BarChart, Playback
+
+COLORS = {name: (1, 0, 0, 1) for name in OPCODES}
+
+
+def make_playback(name="insertion", count=60, record=False, seed=0):
+    rng = random.Random(seed)
+    trace = Trace(rng.randint(64, 300) for _ in range(count))
+    steps = ALGORITHMS[name](list(trace.values), trace)
+    if record:
+        for _ in steps:
+            pass
+        steps = None
+    chart = BarChart(values=trace.values)
+    playback = Playback(chart, trace, colors=COLORS, steps=steps)
+    playback.snapshot_interval = 64
+    return playback
+
+
+def expected(playback, position):
+    return playback.trace.apply(list(playback.trace.values), 0, position)
+
+
+def test_seek_matches_replay():
+    playback = make_playback(record=True)
+    length = len(playback.trace)
+    # Forward within and across intervals, then back across snapshots.
+    for position in (10, 50, 300, 301, length // 2, length, 65, 0, 129, length):
+        playback.seek(position)
+        assert playback.position == position
+        assert playback.chart.values == expected(playback, position)
+
+
+def test_seek_records_lazily():
+    playback = make_playback()
+    playback.seek(100)
+    assert len(playback.trace) == 100
+    assert not playback.finished
+    assert playback.chart.values == expected(playback, 100)
+    playback.seek(10**9)
+    assert playback.finished
+    assert playback.position == len(playback.trace)
+    assert playback.chart.values == sorted(playback.trace.values)
+
+
+def test_advance_then_seek_back():
+    playback = make_playback()
+    playback.advance(500)
+    assert playback.chart.values == expected(playback, 500)
+    playback.seek(130)
+    assert playback.chart.values == expected(playback, 130)
+
+
+def test_finish_records_over_frames():
+    playback = make_playback(count=200)
+    playback.FINISH_CHUNK = 100
+    playback.frame_budget = 0
+    playback.seek(20)
+    playback.finish()
+    # Nothing is recorded until the next frame.
+    assert not playback.finished
+    frames = 0
+    while not playback.finished:
+        Clock.tick()
+        frames += 1
+    assert frames > 1
+    Clock.tick()
+    assert playback._finishing is None
+    assert playback.position == len(playback.trace)
+    assert playback.chart.values == sorted(playback.trace.values)
+
+
+def test_seek_cancels_finish():
+    playback = make_playback(count=200)
+    playback.finish()
+    playback.seek(40)
+    assert playback._finishing is None
+    assert playback.chart.values == expected(playback, 40)
+
+
+def test_set_values_matches_layout():
+    rng = random.Random(1)
+    values = [rng.randint(64, 300) for _ in range(300)]
+    chart = BarChart(values=values, size=(500, 400))
+    chart.BARS_PER_MESH = 128
+    chart.layout()
+    meshes = list(chart._meshes)
+
+    shuffled = list(values)
+    rng.shuffle(shuffled)
+    chart.set_values(shuffled)
+    # Same bar count and tallest value, the buffers are only rewritten.
+    assert chart._meshes == meshes
+    vertices = [array.tolist() for array in chart._vertices]
+    chart.layout()
+    assert vertices == [array.tolist() for array in chart._vertices]
+
+    chart.set_values(shuffled + [400])
+    assert len(chart.values) == 301
+    assert chart._meshes != meshes
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+import registers
+
+
+@pytest.fixture
+def view(tmp_path, monkeypatch):
+    view_path = tmp_path / "View"
+    (view_path / "Home" / "components" / "Card").mkdir(parents=True)
+    (view_path / "Home" / "components" / "Card" / "__pycache__").mkdir()
+    monkeypatch.setattr(registers, "view_path", str(view_path))
+    monkeypatch.setattr(registers, "manifest_path", str(tmp_path / "components.json"))
+    return view_path
+
+
+def test_scan_components(view):
+    manifest = registers.scan_components()
+    assert manifest["components"] == {"Card": "View.Home.components.Card"}
+    assert "." in manifest["directories"]
+    assert not any("__pycache__" in name for name in manifest["directories"])
+
+
+def test_manifest_round_trip(view):
+    assert registers.load_manifest() is None
+    manifest = registers.scan_components()
+    registers.save_manifest(manifest)
+    assert registers.load_manifest() == manifest
+
+
+def test_added_component_invalidates_manifest(view):
+    registers.save_manifest(registers.scan_components())
+    (view / "Home" / "components" / "Button").mkdir()
+    assert registers.load_manifest() is None
+    assert "Button" in registers.scan_components()["components"]
+
+
+def test_directory_mtime_invalidates_manifest(view):
+    registers.save_manifest(registers.scan_components())
+    directory = view / "Home" / "components" / "Card"
+    stat = os.stat(directory)
+    os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert registers.load_manifest() is None
+
+
+def test_removed_directory_invalidates_manifest(view):
+    registers.save_manifest(registers.scan_components())
+    os.rmdir(view / "Home" / "components" / "Card" / "__pycache__")
+    os.rmdir(view / "Home" / "components" / "Card")
+    assert registers.load_manifest() is None
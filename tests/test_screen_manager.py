@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("carbonkivy")
+
+from kivy.clock import Clock
+from kivy.uix.screenmanager import NoTransition, Screen
+
+from View.screen_manager import LazyScreenManager
+
+
+class Page(Screen):
+
+    built = []
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.released = False
+        Page.built.append(self)
+
+    def release(self):
+        self.released = True
+
+
+def make_manager(**kwargs):
+    manager = LazyScreenManager(prebuild_delay=-1, **kwargs)
+    # CScreenManager sets its own transition in __init__.
+    manager.transition = NoTransition()
+    manager.lazy_screens = {"first": Page, "second": Page, "third": Page}
+    return manager
+
+
+def show(manager, name):
+    manager.current = name
+    # Even without a transition, the switch completes on the next frame.
+    Clock.tick()
+
+
+def test_screens_built_on_first_use():
+    manager = make_manager()
+    show(manager, "first")
+    assert manager.screen_names == ["first"]
+    show(manager, "second")
+    assert manager.screen_names == ["first", "second"]
+
+
+def test_unloaded_screen_rebuilt_on_next_use():
+    manager = make_manager()
+    show(manager, "first")
+    first = manager.current_screen
+    show(manager, "second")
+    manager.unload_inactive()
+    assert manager.screen_names == ["second"]
+    assert first.released
+    # The current screen stays.
+    assert not manager.current_screen.released
+
+    show(manager, "first")
+    assert manager.current_screen is not first
+    assert manager.current_screen.name == "first"
+
+
+def test_inactive_policy_unloads_on_leaving():
+    manager = make_manager(unload_policy="inactive")
+    show(manager, "first")
+    show(manager, "third")
+    assert manager.screen_names == ["third"]
+
+
+def test_prebuild_skips_unloaded_screens():
+    manager = make_manager()
+    show(manager, "first")
+    show(manager, "second")
+    manager.unload_inactive()
+    manager.prebuild()
+    assert sorted(manager.screen_names) == ["second", "third"]
+    manager.prebuild()
+    assert sorted(manager.screen_names) == ["second", "third"]
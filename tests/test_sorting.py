@@ -0,0 +1,89 @@
+import random
+import sys
+from array import array
+
+import pytest
+
+from libs.sorting import ALGORITHMS, MAX_QUADRATIC_COUNT, Trace, check_count, record
+
+
+def random_values(count, seed=0):
+    rng = random.Random(seed)
+    return [rng.randint(64, 300) for _ in range(count)]
+
+
+@pytest.mark.parametrize("name", sorted(ALGORITHMS))
+@pytest.mark.parametrize(
+    "values",
+    [[], [7], [5, 5, 5], list(range(40)), list(range(40, 0, -1)), random_values(257)],
+    ids=["empty", "one", "equal", "sorted", "reversed", "random"],
+)
+def test_sorts(name, values):
+    arr = list(values)
+    trace = Trace(values)
+    for _ in ALGORITHMS[name](arr, trace):
+        pass
+    assert arr == sorted(values)
+    # The trace alone replays the sort.
+    assert trace.apply(list(values), 0, len(trace)) == sorted(values)
+    assert all(0 <= trace.first[index] < len(values) for index in range(len(trace)))
+
+
+def test_trace_save_load(tmp_path):
+    trace = record("quick", random_values(301))
+    # An odd step count, so the index columns need padding.
+    trace.key(3)
+    assert len(trace) % 4
+
+    loaded = Trace.load(trace.save(str(tmp_path / "quick.strc")))
+    assert len(loaded) == len(trace)
+    assert list(loaded.values) == list(trace.values)
+    assert list(loaded.ops) == list(trace.ops)
+    assert list(loaded.first) == list(trace.first)
+    assert list(loaded.second) == list(trace.second)
+    assert loaded[7] == trace[7]
+    values = list(loaded.values)
+    assert loaded.apply(values, 0, len(loaded)) == sorted(trace.values)
+
+
+def test_trace_load_other_byte_order(tmp_path):
+    trace = record("shell", random_values(50))
+    path = str(tmp_path / "shell.strc")
+    trace.save(path)
+    # Rewrites the file as the other byte order would have.
+    with open(path, "rb") as file:
+        data = bytearray(file.read())
+    order = b">" if sys.byteorder == "little" else b"<"
+    Trace.HEADER.pack_into(
+        data, 0, Trace.MAGIC, Trace.VERSION, order, len(trace.values), len(trace)
+    )
+    offset = Trace.HEADER.size
+    columns = [(offset, len(trace.values))]
+    offset += len(trace.values) * 4 + len(trace)
+    offset += -offset % 4
+    columns += [(offset, len(trace)), (offset + len(trace) * 4, len(trace))]
+    for start, count in columns:
+        column = array("i", data[start : start + count * 4])
+        column.byteswap()
+        data[start : start + count * 4] = column.tobytes()
+    with open(path, "wb") as file:
+        file.write(data)
+
+    loaded = Trace.load(path)
+    assert list(loaded.values) == list(trace.values)
+    assert list(loaded.first) == list(trace.first)
+    assert list(loaded.second) == list(trace.second)
+
+
+def test_trace_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.strc"
+    path.write_bytes(bytes(64))
+    with pytest.raises(ValueError):
+        Trace.load(str(path))
+
+
+def test_check_count():
+    check_count(["bubble", "merge"], MAX_QUADRATIC_COUNT)
+    check_count(["merge", "radix"], 100000)
+    with pytest.raises(ValueError):
+        check_count(["merge", "insertion"], MAX_QUADRATIC_COUNT + 1)
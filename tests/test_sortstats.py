@@ -0,0 +1,83 @@
+import pytest
+
+from libs import sortstats
+from libs.sortstats import fit_exponent, measure, run, steps
+
+
+@pytest.mark.parametrize("k", [0.5, 1, 2, 2.5])
+def test_fit_exponent_exact(k):
+    assert fit_exponent((n, n**k) for n in (8, 64, 512, 4096)) == pytest.approx(k)
+
+
+@pytest.mark.parametrize(
+    "points", [[], [(100, 5)], [(100, 5), (100, 7)], [(0, 1), (10, 0), (20, 3)]]
+)
+def test_fit_exponent_needs_two_sizes(points):
+    assert fit_exponent(points) is None
+
+
+def test_measure_counts_steps():
+    result = measure("bubble", [3, 2, 1])
+    assert result["n"] == 3
+    assert result["compares"] == 3
+    assert result["swaps"] == 3
+    assert steps(result) == 6
+
+
+def test_measure_checks_the_result(monkeypatch):
+    def unsorted_steps(arr, trace):
+        trace.compare(0, 1)
+        yield
+
+    monkeypatch.setitem(sortstats.ALGORITHMS, "broken", unsorted_steps)
+    with pytest.raises(AssertionError):
+        measure("broken", [2, 1])
+
+
+def test_run_stops_growing_after_timeout(monkeypatch):
+    def fake_measure(algorithm, values):
+        n = len(values)
+        # Merge sort is slow from 64 values up.
+        seconds = 2.0 if algorithm == "merge" and n >= 64 else 0.001
+        return {
+            "algorithm": algorithm,
+            "n": n,
+            "compares": n,
+            "swaps": 0,
+            "writes": 0,
+            "seconds": seconds,
+        }
+
+    monkeypatch.setattr(sortstats, "measure", fake_measure)
+    seen = []
+    report = run(
+        ["merge", "quick"],
+        ["random"],
+        sizes=(128, 16, 64, 32),
+        timeout=1.0,
+        progress=seen.append,
+    )
+    sizes = {
+        algorithm: [r["n"] for r in report["results"] if r["algorithm"] == algorithm]
+        for algorithm in ("merge", "quick")
+    }
+    assert sizes == {"merge": [16, 32, 64], "quick": [16, 32, 64, 128]}
+    assert seen == report["results"]
+    fits = {fit["algorithm"]: fit for fit in report["exponents"]}
+    assert fits["quick"]["steps"] == pytest.approx(1)
+
+
+def test_run_cancelled():
+    calls = []
+
+    def cancelled():
+        calls.append(None)
+        return len(calls) > 2
+
+    report = run(
+        ["quick", "merge"], ["sorted"], sizes=(16, 32, 64), cancelled=cancelled
+    )
+    assert [(r["algorithm"], r["n"]) for r in report["results"]] == [
+        ("quick", 16),
+        ("quick", 32),
+    ]
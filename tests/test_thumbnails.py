@@ -0,0 +1,88 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from PIL import Image
+
+from libs.thumbnails import ThumbnailStore
+
+
+def make_image(path, size=(400, 300), color=(200, 120, 40), exif=None):
+    img = Image.new("RGB", size, color)
+    if exif is None:
+        img.save(path)
+    else:
+        img.save(path, exif=exif)
+    return str(path)
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        yield ThumbnailStore(str(tmp_path / "thumbnails"), size=64, executor=executor)
+
+
+def test_make_and_find(tmp_path, store):
+    source = make_image(tmp_path / "a.jpg")
+    assert store.find(source) is None
+    path = store.make(source)
+    assert store.find(source) == path
+    assert store.key(source) == store.key(source)
+    with Image.open(path) as img:
+        assert img.size == (64, 48)
+    # Made again under the same key, the store does not grow.
+    assert store.make(source) == path
+    assert store.stats()["entries"] == 1
+
+
+def test_changed_source_misses(tmp_path, store):
+    source = make_image(tmp_path / "a.jpg")
+    key = store.key(source)
+    store.make(source)
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert store.key(source) != key
+    assert store.find(source) is None
+
+
+def test_least_recently_used_evicted(tmp_path, store):
+    sources = [
+        make_image(tmp_path / f"{index}.png", color=(index * 40, 0, 0))
+        for index in range(3)
+    ]
+    paths = [store.make(source) for source in sources[:2]]
+    size = os.path.getsize(paths[0])
+    store.max_bytes = size * 2 + size // 2
+    # Used last, the first one outlives the second.
+    store.find(sources[0])
+    store.make(sources[2])
+    assert os.path.exists(paths[0])
+    assert not os.path.exists(paths[1])
+    assert store.find(sources[1]) is None
+    assert store.stats()["bytes"] <= store.max_bytes
+
+
+def test_state_survives_restart(tmp_path, store):
+    source = make_image(tmp_path / "a.jpg")
+    path = store.make(source)
+    other = ThumbnailStore(store.directory, size=64)
+    assert other.find(source) == path
+    assert other.stats()["bytes"] == os.path.getsize(path)
+
+
+def test_request(tmp_path, store):
+    source = make_image(tmp_path / "a.jpg")
+    path = store.request(source).result(timeout=10)
+    assert os.path.exists(path)
+    # Stored, the future is done right away.
+    future = store.request(source)
+    assert future.done()
+    assert future.result() == path
+
+
+def test_thumbnail_upright(tmp_path, store):
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    source = make_image(tmp_path / "sideways.jpg", exif=exif)
+    with Image.open(store.make(source)) as img:
+        assert img.size == (48, 64)
@@ -0,0 +1,61 @@
+import gc
+
+from libs.tracing import _TimedCallback
+
+
+class Owner:
+    def __init__(self):
+        self.calls = []
+
+    def tick(self, dt):
+        self.calls.append(dt)
+        return True
+
+
+def test_timed_callback_runs_and_matches():
+    owner = Owner()
+    callback = _TimedCallback(owner.tick)
+    assert callback(0.5) is True
+    assert owner.calls == [0.5]
+    assert callback == owner.tick
+    assert hash(callback) == hash(owner.tick)
+    assert callback != Owner().tick
+
+
+def test_timed_callback_holds_methods_strongly_until_first_run():
+    owner = Owner()
+    callback = _TimedCallback(owner.tick)
+    calls = owner.calls
+    del owner
+    gc.collect()
+    assert callback(0) is True
+    assert calls == [0]
+
+
+def test_timed_callback_holds_methods_weakly_after_first_run():
+    owner = Owner()
+    callback = _TimedCallback(owner.tick)
+    callback(0)
+    del owner
+    gc.collect()
+    assert callback(1) is False
+    assert callback != Owner().tick
+
+
+def test_timed_callback_keeps_methods_without_release_ref():
+    owner = Owner()
+    callback = _TimedCallback(owner.tick, release_ref=False)
+    callback(0)
+    calls = owner.calls
+    del owner
+    gc.collect()
+    assert callback(1) is True
+    assert calls == [0, 1]
+
+
+def test_timed_callback_keeps_functions():
+    calls = []
+    callback = _TimedCallback(lambda dt: calls.append(dt))
+    gc.collect()
+    callback(1)
+    assert calls == [1]